@@ -0,0 +1,146 @@
+"""Per-client rate limiting and admission control for LLM calls.
+
+`RateLimiter` is a token bucket per client: `burst` requests at once, then
+`rate` per second. Buckets live in a bounded LRU, so a flood of distinct
+clients can't grow memory without limit (an evicted client just starts
+again with a full bucket).
+
+`ConcurrencyLimiter` caps the provider calls in flight. A caller that finds
+every slot busy may wait briefly in a bounded queue; when the queue is
+full, or the wait times out, the call is shed and the caller serves a
+cached or rule-based answer instead of piling onto a slow provider.
+"""
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+
+class Overloaded(Exception):
+    """Raised when a provider call is shed by the concurrency limiter"""
+
+
+class RateLimiter:
+    """Token bucket per client key (IP address or client id)"""
+
+    def __init__(self, rate: float = 1.0, burst: int = 10, max_clients: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()  # client -> (tokens, updated_at)
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def allow(self, client: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """(allowed, seconds until the request would be allowed)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+                self.allowed += 1
+            else:
+                self.limited += 1
+            self._buckets[client] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            retry_after = 0.0 if allowed else (cost - tokens) / self.rate
+            return allowed, retry_after
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'rate_per_second': self.rate, 'burst': self.burst, 'clients': len(self._buckets),
+                    'allowed': self.allowed, 'limited': self.limited}
+
+
+class ConcurrencyLimiter:
+    """At most `limit` calls in flight, `max_waiting` queued for up to `wait_timeout` seconds.
+
+    No queue by default: a call that can't start right away is shed, so the
+    caller answers from its fallback at once instead of waiting.
+    """
+
+    def __init__(self, limit: int = 16, max_waiting: int = 0, wait_timeout: float = 2.0,
+                 metrics=None):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.metrics = metrics
+        self._condition = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_in_flight = 0
+        self.peak_waiting = 0
+        self.admitted = 0
+        self.shed = {'queue_full': 0, 'timeout': 0}
+
+    def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if there's room; False if shed"""
+        with self._condition:
+            if self.in_flight >= self.limit:
+                if self.waiting >= self.max_waiting:
+                    return self._shed('queue_full')
+                self.waiting += 1
+                self.peak_waiting = max(self.peak_waiting, self.waiting)
+                self._report()
+                deadline = time.monotonic() + self.wait_timeout
+                try:
+                    while self.in_flight >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+                if self.in_flight >= self.limit:
+                    return self._shed('timeout')
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.admitted += 1
+            self._report()
+            return True
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._report()
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self):
+        """`with limiter.slot():` around a provider call; raises Overloaded when shed"""
+        if not self.acquire():
+            raise Overloaded('Too many provider calls in flight')
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _shed(self, reason: str) -> bool:
+        self.shed[reason] += 1
+        if self.metrics:
+            self.metrics.inc('llm_admission_shed_total', reason=reason)
+        self._report()
+        return False
+
+    def _report(self):
+        if self.metrics:
+            self.metrics.set_gauge('llm_in_flight', self.in_flight)
+            self.metrics.set_gauge('llm_queue_depth', self.waiting)
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'max_waiting': self.max_waiting,
+                'in_flight': self.in_flight,
+                'queue_depth': self.waiting,
+                'peak_in_flight': self.peak_in_flight,
+                'peak_queue_depth': self.peak_waiting,
+                'admitted': self.admitted,
+                'shed': dict(self.shed)
+            }
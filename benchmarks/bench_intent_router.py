@@ -0,0 +1,97 @@
+"""Micro-benchmark: intent routing cost as intents and the roster grow.
+
+Compares the compiled IntentRouter against the linear keyword/alias scan it
+replaced. Routing cost for the automaton should stay flat while the linear
+scan grows with every intent keyword and player alias.
+
+    python benchmarks/bench_intent_router.py
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import IntentRouter  # noqa: E402
+
+MESSAGES = [
+    "Who should I pick as captain for today's IPL match?",
+    "Should I pick Virat Kohli or Rohit Sharma today?",
+    "Give me team strategy for MI vs CSK match",
+    "How will today's weather affect the IPL match?",
+    "Give me 3 differential picks for today's IPL matches",
+    "What IPL matches are live today?",
+    "Is Bumrah worth the price this week?",
+    "hello there"
+]
+
+BASE_INTENTS = {
+    'captain': ['captain', 'captaincy'],
+    'team': ['team', 'squad', 'xi'],
+    'differential': ['differential'],
+    'conditions': ['weather', 'pitch', 'conditions'],
+    'live': ['live', 'current', 'ongoing']
+}
+
+BASE_PLAYERS = {
+    'virat': 'virat_kohli', 'kohli': 'virat_kohli', 'rohit': 'rohit_sharma',
+    'bumrah': 'jasprit_bumrah', 'hardik': 'hardik_pandya', 'jadeja': 'ravindra_jadeja'
+}
+
+
+def random_word(rng: random.Random) -> str:
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+
+
+def build_vocabulary(intents: int, players: int, seed: int = 7) -> tuple:
+    """Base intents/players padded with synthetic ones up to the requested sizes"""
+    rng = random.Random(seed)
+    intent_keywords = dict(BASE_INTENTS)
+    while len(intent_keywords) < intents:
+        intent_keywords[f"intent_{len(intent_keywords)}"] = [random_word(rng) for _ in range(3)]
+    aliases = dict(BASE_PLAYERS)
+    for i in range(players):
+        key = f"player_{i}"
+        first, last = random_word(rng), random_word(rng)
+        aliases[f"{first} {last}"] = key
+        aliases[first] = key
+        aliases[last] = key
+    return intent_keywords, aliases
+
+
+def linear_route(message: str, intent_keywords: dict, aliases: dict) -> tuple:
+    """The old approach: substring checks over every keyword and alias"""
+    message_lower = message.lower()
+    players = [key for alias, key in aliases.items() if alias in message_lower]
+    for intent, keywords in intent_keywords.items():
+        if any(word in message_lower for word in keywords):
+            return intent, players
+    return 'general', players
+
+
+def time_per_route(func, repeat: int) -> float:
+    """Best-of-3 mean microseconds to route every message once"""
+    runs = timeit.repeat(lambda: [func(m) for m in MESSAGES], number=repeat, repeat=3)
+    return min(runs) / (repeat * len(MESSAGES)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'intents':>8} {'players':>8} {'states':>8} {'router µs':>10} {'linear µs':>10}")
+    for intents in (5, 50, 500):
+        for players in (30, 300, 3000):
+            intent_keywords, aliases = build_vocabulary(intents, players)
+            router = IntentRouter(intent_keywords, aliases)
+            router_us = time_per_route(router.route, args.repeat)
+            linear_us = time_per_route(lambda m: linear_route(m, intent_keywords, aliases), args.repeat)
+            print(f"{intents:>8} {players:>8} {len(router):>8} {router_us:>10.1f} {linear_us:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
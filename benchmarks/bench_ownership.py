@@ -0,0 +1,84 @@
+"""Ownership analytics cost: team ingest rate, ranking time and sketch accuracy.
+
+Feeds `--teams` random XIs (popular players picked more often) into an
+`OwnershipTracker` in batches, then times `build_differential_picks` with
+submitted ownership and compares the sketch's ownership with exact counts.
+
+    python benchmarks/bench_ownership.py --teams 200000
+    python benchmarks/bench_ownership.py --batch 1 --teams 20000   # one team per request
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LLM_PROVIDER', 'stub')
+
+import server  # noqa: E402
+from ownership import OwnershipTracker, Team  # noqa: E402
+
+
+def random_teams(keys: list, count: int, rng: random.Random) -> list:
+    weights = [1 / (rank + 1) for rank in range(len(keys))]
+    teams = []
+    for _ in range(count):
+        picked = set()
+        while len(picked) < 11:
+            picked.add(rng.choices(keys, weights)[0])
+        players = tuple(picked)
+        teams.append(Team(players, players[0], players[1]))
+    return teams
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--teams', type=int, default=200000)
+    parser.add_argument('--batch', type=int, default=1000, help='teams per add_teams call')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--output', help='write the summary as JSON to this file')
+    args = parser.parse_args()
+
+    server.create_app(start_background=False)
+    ai = server.cricket_ai
+    keys = [ai.player_key(player) for player, _, _ in ai.score_match_pool()]
+    teams = random_teams(keys, args.teams, random.Random(7))
+
+    tracker = OwnershipTracker()
+    started = time.perf_counter()
+    for i in range(0, len(teams), args.batch):
+        tracker.add_teams(teams[i:i + args.batch])
+    ingest = time.perf_counter() - started
+
+    exact = Counter(key for team in teams for key in team.players)
+    estimated = tracker.ownership(keys)
+    errors = [abs(estimated[i] - exact[key] / len(teams)) for i, key in enumerate(keys)]
+
+    ai.ownership = tracker
+    timings = []
+    for _ in range(args.queries):
+        started = time.perf_counter()
+        payload, _ = ai.build_differential_picks()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    summary = {
+        'teams': args.teams, 'batch': args.batch, 'players': len(keys),
+        'ingest_teams_per_second': round(args.teams / ingest),
+        'ownership_max_abs_error': round(max(errors), 5),
+        'differential_picks_p50_ms': round(statistics.median(timings), 3),
+        'differential_picks_max_ms': round(max(timings), 3),
+        'ownership_source': payload['ownership']['source'],
+        'stats': tracker.stats()
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Startup cost: module imports and CricketAI initialisation, in fresh interpreters.
+
+Each run starts a new Python process (so nothing is cached in memory) and
+times `import server`, then `create_app(start_background=False)` (what a
+preloading master does before fork), then starting the background work.
+Also lists the slowest imports reported by `python -X importtime`.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import server
+imported = time.perf_counter()
+server.create_app(start_background=False)
+built = time.perf_counter()
+server.cricket_ai.start_background()
+background = time.perf_counter()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'init_ms': (built - imported) * 1000,
+                  'background_ms': (background - built) * 1000}))
+"""
+
+
+def probe_env() -> dict:
+    env = dict(os.environ, LLM_PROVIDER=os.environ.get('LLM_PROVIDER', 'stub'))
+    env.setdefault('LIVE_DATA_INTERVAL', '3600')
+    return env
+
+
+def run_probe() -> dict:
+    output = subprocess.check_output([sys.executable, '-c', PROBE], cwd=ROOT, env=probe_env(),
+                                     text=True, stderr=subprocess.DEVNULL)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(count: int) -> list:
+    """(module, cumulative ms) of the top-level imports under `import server`"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import server'], cwd=ROOT,
+                            env=probe_env(), text=True, capture_output=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Two more spaces of indent per nesting level; keep server and what it imports directly
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            imports.append((name.strip(), int(cumulative) / 1000))
+    return sorted(imports, key=lambda item: -item[1])[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to time')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    runs = [run_probe() for _ in range(args.runs)]
+    results = {'runs': args.runs, 'median_ms': {}, 'imports_ms': {}}
+    print(f"{'phase':>14} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    for phase in ('import_ms', 'init_ms', 'background_ms'):
+        values = [run[phase] for run in runs]
+        results['median_ms'][phase] = round(statistics.median(values), 2)
+        print(f"{phase[:-3]:>14} {statistics.median(values):>10.2f} {min(values):>8.2f} {max(values):>8.2f}")
+
+    print(f"\n{'import':>40} {'ms':>8}")
+    for name, millis in slowest_imports(args.top):
+        results['imports_ms'][name] = millis
+        print(f"{name:>40} {millis:>8.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
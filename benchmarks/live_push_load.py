@@ -0,0 +1,153 @@
+"""Load generator for the live push server: many idle SSE subscribers.
+
+Opens `--clients` connections to the push endpoint, keeps them idle and
+reports how many are connected, how many events each round delivered and
+the delivery latency of `delta` events (from the server's `sent` stamp, so
+run it on the same host). `--slow N` makes N clients stop reading, which
+the server should disconnect once their buffer fills instead of slowing
+everyone else down.
+
+    python live_push.py demo --port 5001 --interval 1 &
+    python benchmarks/live_push_load.py --url http://127.0.0.1:5001/api/live/subscribe --clients 10000
+
+    # Or start the demo server in a child process
+    python benchmarks/live_push_load.py --demo --clients 10000 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from live_push import raise_open_file_limit  # noqa: E402
+
+SENT = re.compile(rb'"sent":([0-9.]+)')
+
+
+class Totals:
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.closed = 0
+        self.snapshots = 0
+        self.deltas = 0
+        self.latencies = []
+
+
+async def subscriber(host: str, port: int, path: str, totals: Totals, slow: bool, stop: asyncio.Event):
+    try:
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+        await reader.readuntil(b'\r\n\r\n')
+    except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        totals.failed += 1
+        return
+    totals.connected += 1
+    try:
+        if slow:
+            await stop.wait()  # never read: the server should cut us off
+            return
+        while not stop.is_set():
+            message = await reader.readuntil(b'\n\n')
+            if message.startswith(b'event: delta'):
+                totals.deltas += 1
+                sent = SENT.search(message)
+                if sent:
+                    totals.latencies.append(time.time() - float(sent.group(1)))
+            elif message.startswith(b'event: snapshot'):
+                totals.snapshots += 1
+    except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        totals.closed += 1
+    finally:
+        totals.connected -= 1
+        writer.close()
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000 if ordered else 0.0
+
+
+async def run(args) -> dict:
+    url = urlparse(args.url)
+    totals = Totals()
+    stop = asyncio.Event()
+    tasks = []
+    started = time.perf_counter()
+    for i in range(args.clients):
+        tasks.append(asyncio.create_task(subscriber(url.hostname, url.port or 80, url.path, totals,
+                                                    i < args.slow, stop)))
+        if i % args.ramp == args.ramp - 1:
+            await asyncio.sleep(0.01)  # don't overflow the listen backlog
+    ramp_seconds = time.perf_counter() - started
+
+    print(f"{'t':>5} {'connected':>10} {'failed':>7} {'closed':>7} {'deltas':>9} "
+          f"{'p50 ms':>8} {'p99 ms':>8}")
+    end = time.perf_counter() + args.duration
+    while time.perf_counter() < end:
+        await asyncio.sleep(args.report)
+        window, totals.latencies = totals.latencies, []
+        print(f"{time.perf_counter() - started:>5.0f} {totals.connected:>10} {totals.failed:>7} "
+              f"{totals.closed:>7} {totals.deltas:>9} {percentile(window, 0.5):>8.1f} "
+              f"{percentile(window, 0.99):>8.1f}")
+        if args.report_latencies is not None:
+            args.report_latencies.extend(window)
+
+    connected = totals.connected
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {'clients': args.clients, 'connected_at_end': connected, 'failed': totals.failed,
+            'closed_by_server': totals.closed, 'snapshots': totals.snapshots, 'deltas': totals.deltas,
+            'ramp_seconds': round(ramp_seconds, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5001/api/live/subscribe')
+    parser.add_argument('--clients', type=int, default=10000)
+    parser.add_argument('--slow', type=int, default=0, help='clients that never read')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds to hold the connections')
+    parser.add_argument('--report', type=float, default=5.0, help='seconds between report lines')
+    parser.add_argument('--ramp', type=int, default=500, help='connections opened per 10ms step')
+    parser.add_argument('--demo', action='store_true', help='start `live_push.py demo` for the URL first')
+    parser.add_argument('--interval', type=float, default=1.0, help='demo update interval')
+    parser.add_argument('--output', help='write the summary as JSON to this file')
+    args = parser.parse_args()
+    args.report_latencies = []
+
+    print(f"open files limit: {raise_open_file_limit()}")
+    demo = None
+    if args.demo:
+        url = urlparse(args.url)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        demo = subprocess.Popen([sys.executable, os.path.join(root, 'live_push.py'), 'demo',
+                                 '--host', url.hostname, '--port', str(url.port or 80),
+                                 '--interval', str(args.interval)],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        time.sleep(1.5)
+    try:
+        summary = asyncio.run(run(args))
+    finally:
+        if demo:
+            demo.terminate()
+            demo.wait()
+
+    latencies = args.report_latencies
+    summary.update({'delta_p50_ms': round(percentile(latencies, 0.5), 2),
+                    'delta_p99_ms': round(percentile(latencies, 0.99), 2)})
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
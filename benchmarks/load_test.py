@@ -0,0 +1,256 @@
+"""Load test: throughput and latency of every Flask route, in-process.
+
+Drives `server.app` through Flask's test client from a pool of threads with
+a weighted mix of real user queries. LLM providers are replaced by the stub
+providers (LLM_PROVIDER=stub) so results don't depend on network or API
+keys. `chat` repeats a small set of questions (mostly response-cache hits);
+`chat-uncached` sends a new question every time, so it measures the
+provider path (admission, deadlines, hedging). Chat answers are also
+counted by path (cache, provider, rule_based). Also micro-benchmarks the
+hot CricketAI methods, including scalar vs vectorized form scoring at a few
+roster sizes.
+
+    python benchmarks/load_test.py --concurrency 1,8,32 --duration 10
+    python benchmarks/load_test.py --output before.json
+    python benchmarks/load_test.py --compare before.json   # exit 1 on regression
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHAT_MESSAGES = [
+    "Who should I pick as captain for today's IPL match?",
+    "Should I pick Virat Kohli or Rohit Sharma today?",
+    "Give me team strategy for MI vs CSK match",
+    "How will today's weather affect the IPL match?",
+    "Give me 3 differential picks for today's IPL matches",
+    "What IPL matches are live today?",
+    "How is Bumrah's form?",
+    "Compare Dhoni and Jadeja",
+    "What's the pitch report at Wankhede?",
+    "Any tips for my fantasy team?"
+]
+
+# Open questions (no intent, so they're cached by their text): with a
+# counter appended each one misses the response cache
+UNCACHED_MESSAGES = [
+    "What should a first-time fantasy player keep in mind",
+    "Explain how powerplay overs change fantasy scoring",
+    "Why do some players score more fantasy points away from home",
+    "What makes a good fantasy cricket strategy for a long season"
+]
+
+CHAT_PATHS = ('cache', 'provider', 'rule_based')
+
+QUICK_ACTIONS = ['best-team', 'differential-picks', 'captain-options', 'budget-picks', 'fantasy-tips']
+
+# (name, weight, method, path) - chat dominates real traffic, dashboard reads follow
+ROUTES = [
+    ('chat', 30, 'POST', '/api/chat'),
+    ('chat-uncached', 10, 'POST', '/api/chat'),
+    ('matches', 10, 'GET', '/api/matches'),
+    ('live-stats', 10, 'GET', '/api/live-stats'),
+    ('match-analysis', 10, 'GET', '/api/match-analysis')
+] + [(f"quick-actions/{action}", 6, 'GET', f"/api/quick-actions/{action}") for action in QUICK_ACTIONS]
+
+FORM_CONTEXT = {'venue': 'Wankhede Stadium, Mumbai', 'opposition': 'CSK'}
+
+
+def load_app(stub_latency: float):
+    """Import the server with stubbed LLM providers"""
+    os.environ['LLM_PROVIDER'] = 'stub'
+    os.environ.setdefault('STUB_LLM_LATENCY', str(stub_latency))
+    # Every simulated user shares one client address: don't rate-limit them
+    os.environ.setdefault('CHAT_RATE_LIMIT', '1e9')
+    os.environ.setdefault('CHAT_RATE_BURST', '1000000000')
+    import server
+    server.create_app()
+    return server
+
+
+def percentiles(samples: list) -> dict:
+    ordered = sorted(samples)
+    if not ordered:
+        return {'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0}
+
+    def at(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+    return {'p50_ms': at(0.5), 'p95_ms': at(0.95), 'p99_ms': at(0.99)}
+
+
+def run_load(app, concurrency: int, duration: float, seed: int) -> dict:
+    """Hammer the routes from `concurrency` threads for `duration` seconds"""
+    latencies = {name: [] for name, _, _, _ in ROUTES}
+    errors = {name: 0 for name, _, _, _ in ROUTES}
+    lock = threading.Lock()
+    start = threading.Barrier(concurrency + 1)
+    deadline = [0.0]
+
+    def worker(worker_id: int):
+        rng = random.Random(seed + worker_id)
+        client = app.test_client()
+        routes = list(ROUTES)
+        weights = [route[1] for route in ROUTES]
+        local = {name: [] for name, _, _, _ in ROUTES}
+        failed = {name: 0 for name, _, _, _ in ROUTES}
+        start.wait()
+        while time.perf_counter() < deadline[0]:
+            name, _, method, path = rng.choices(routes, weights)[0]
+            if name == 'chat-uncached':
+                sent = len(local[name]) + failed[name]
+                message = f"{rng.choice(UNCACHED_MESSAGES)} (fan {worker_id}.{sent})?"
+            else:
+                message = rng.choice(CHAT_MESSAGES)
+            began = time.perf_counter()
+            if method == 'POST':
+                response = client.post(path, json={'message': message})
+            else:
+                response = client.get(path)
+            response.get_data()
+            local[name].append(time.perf_counter() - began)
+            if response.status_code != 200:
+                failed[name] += 1
+        with lock:
+            for name in local:
+                latencies[name].extend(local[name])
+                errors[name] += failed[name]
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    deadline[0] = time.perf_counter() + duration
+    began = time.perf_counter()
+    start.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    all_samples = [s for samples in latencies.values() for s in samples]
+    routes = {}
+    for name, samples in latencies.items():
+        routes[name] = dict(requests=len(samples), errors=errors[name],
+                            rps=round(len(samples) / elapsed, 1), **percentiles(samples))
+    return dict(concurrency=concurrency, duration_s=round(elapsed, 2), requests=len(all_samples),
+                errors=sum(errors.values()), rps=round(len(all_samples) / elapsed, 1),
+                **percentiles(all_samples), routes=routes)
+
+
+def micro_benchmarks(cricket_ai, repeat: int) -> dict:
+    """Mean microseconds per call for the hot CricketAI methods (best of 3)"""
+    players = [player['name'] for group in cricket_ai.player_db.values() for player in group.values()]
+
+    def per_call(func, calls: int) -> float:
+        runs = timeit.repeat(func, number=repeat, repeat=3)
+        return round(min(runs) / (repeat * calls) * 1e6, 2)
+
+    results = {}
+    # Scalar vs vectorized form scoring per roster size (analyze_players_form
+    # picks one by CricketAI.FORM_BATCH_MIN); rosters past the database repeat it
+    for size in (5, 22, len(players), 4 * len(players)):
+        names = (players * 4)[:size]
+        results[f'analyze_player_form/{size}'] = per_call(
+            lambda names=names: [cricket_ai.analyze_player_form(p, FORM_CONTEXT) for p in names], size)
+        results[f'analyze_players_form_vectorized/{size}'] = per_call(
+            lambda names=names: cricket_ai.analyze_players_form_vectorized(names, FORM_CONTEXT), size)
+        results[f'analyze_players_form/{size}'] = per_call(
+            lambda names=names: cricket_ai.analyze_players_form(names, FORM_CONTEXT), size)
+    results['get_rule_based_response'] = per_call(
+        lambda: [cricket_ai.get_rule_based_response(m) for m in CHAT_MESSAGES], len(CHAT_MESSAGES))
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Regressions larger than `threshold` (fraction) against a baseline result"""
+    regressions = []
+    previous_runs = {run['concurrency']: run for run in baseline.get('load', [])}
+    for run in current['load']:
+        previous = previous_runs.get(run['concurrency'])
+        if not previous:
+            continue
+        if run['rps'] < previous['rps'] * (1 - threshold):
+            regressions.append(f"c={run['concurrency']} rps {previous['rps']} -> {run['rps']}")
+        for key in ('p50_ms', 'p99_ms'):
+            if run[key] > previous[key] * (1 + threshold):
+                regressions.append(f"c={run['concurrency']} {key} {previous[key]} -> {run[key]}")
+    for name, micros in current['micro_us'].items():
+        before = baseline.get('micro_us', {}).get(name)
+        if before and micros > before * (1 + threshold):
+            regressions.append(f"{name} {before}µs -> {micros}µs")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', default='1,8,32',
+                        help='comma-separated thread counts to run (default 1,8,32)')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per concurrency level')
+    parser.add_argument('--stub-latency', type=float, default=0.05,
+                        help='simulated LLM latency in seconds (default 0.05)')
+    parser.add_argument('--repeat', type=int, default=200, help='micro-benchmark iterations')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='baseline JSON from a previous run')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown vs. the baseline (default 0.2 = 20%%)')
+    args = parser.parse_args()
+
+    server = load_app(args.stub_latency)
+    server.logging.getLogger().setLevel(server.logging.WARNING)
+
+    results = {'commit': git_commit(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'stub_latency_s': args.stub_latency, 'load': []}
+    print(f"{'threads':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for concurrency in (int(c) for c in args.concurrency.split(',')):
+        answered = {path: server.metrics.counter_value('chat_answers_total', path=path) for path in CHAT_PATHS}
+        run = run_load(server.app, concurrency, args.duration, args.seed)
+        run['chat_answers'] = {path: int(server.metrics.counter_value('chat_answers_total', path=path)
+                                         - answered[path]) for path in CHAT_PATHS}
+        results['load'].append(run)
+        print(f"{concurrency:>8} {run['rps']:>9.1f} {run['p50_ms']:>9.2f} {run['p95_ms']:>9.2f} "
+              f"{run['p99_ms']:>9.2f} {run['errors']:>7}")
+
+    print(f"\n{'threads':>8} " + ' '.join(f"{path:>11}" for path in CHAT_PATHS) + "  (chat answers by path)")
+    for run in results['load']:
+        print(f"{run['concurrency']:>8} " + ' '.join(f"{run['chat_answers'][path]:>11}" for path in CHAT_PATHS))
+
+    print(f"\n{'route':>30} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, route in results['load'][-1]['routes'].items():
+        print(f"{name:>30} {route['rps']:>9.1f} {route['p50_ms']:>9.2f} {route['p99_ms']:>9.2f}")
+
+    results['micro_us'] = micro_benchmarks(server.cricket_ai, args.repeat)
+    print(f"\n{'function':>30} {'µs/call':>9}")
+    for name, micros in results['micro_us'].items():
+        print(f"{name:>30} {micros:>9.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("\nNo regressions against", args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """Key/value cache with TTL and single-flight recomputation.
+
+    `get_or_compute` guarantees that when a key is missing or expired only
+    one caller recomputes it; concurrent callers wait for that result. If the
+    compute function raises, nothing is cached and the error propagates.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: float,
+                       wait_timeout: float = 30.0) -> Any:
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        return {}
+
+
+class _Flight:
+    """An in-progress computation other threads can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key within one process"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: str, func: Callable[[], Any], wait_timeout: float = 30.0) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if not flight.done.wait(wait_timeout):
+                raise TimeoutError(f"Timed out waiting for {key!r}")
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = func()
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class LocalLRUCache(CacheBackend):
+    """In-process LRU cache with per-entry TTL (thread-safe)"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._single_flight = SingleFlight()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: float,
+                       wait_timeout: float = 30.0) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        def compute_and_store():
+            # A previous leader may have just stored it
+            value = self.get(key)
+            if value is None:
+                value = compute()
+                self.set(key, value, ttl)
+            return value
+
+        return self._single_flight.do(key, compute_and_store, wait_timeout)
+
+    def stats(self) -> Dict:
+        return {
+            'backend': 'memory',
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'coalesced': self._single_flight.coalesced
+        }
+
+
+class SQLiteCache(CacheBackend):
+    """Cache shared by every worker process on a host, stored in SQLite (WAL mode).
+
+    Values must be JSON-serialisable. Recomputation is coalesced across
+    processes with a lease row: the worker that inserts the lease computes,
+    the others poll for the value until it appears or the lease expires.
+    Threads inside one process are coalesced in memory first, so each
+    process has at most one waiter polling the database per key.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, lease_seconds: float = 30.0,
+                 poll_interval: float = 0.01):
+        self.path = path
+        self.max_entries = max_entries
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.owner = uuid.uuid4().hex
+        self._local = threading.local()
+        self._single_flight = SingleFlight()
+        self.coalesced = 0
+        self._connect().executescript("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at);
+            CREATE TABLE IF NOT EXISTS leases (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+        """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread and process (connections don't survive fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute('SELECT value, expires_at, accessed_at FROM cache WHERE key = ?',
+                           (key,)).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        # Refresh the LRU clock at most once a second per key to keep writes cheap
+        if now - row[2] > 1.0:
+            conn.execute('UPDATE cache SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.time()
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) '
+                     'VALUES (?, ?, ?, ?)', (key, json.dumps(value), now + ttl, now))
+        # Evict expired entries, then least recently used ones over the limit
+        conn.execute('DELETE FROM cache WHERE expires_at <= ?', (now,))
+        conn.execute('DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                     'ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def delete(self, key: str):
+        self._connect().execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM cache')
+
+    def _acquire_lease(self, key: str) -> bool:
+        now = time.time()
+        conn = self._connect()
+        cursor = conn.execute(
+            'INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+            'WHERE leases.expires_at <= ?',
+            (key, self.owner, now + self.lease_seconds, now))
+        return cursor.rowcount == 1
+
+    def _release_lease(self, key: str):
+        self._connect().execute('DELETE FROM leases WHERE key = ? AND owner = ?', (key, self.owner))
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: float,
+                       wait_timeout: float = 30.0) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+        # Coalesce threads of this process first, then processes via the lease
+        return self._single_flight.do(
+            key, lambda: self._compute_shared(key, compute, ttl, wait_timeout), wait_timeout)
+
+    def _compute_shared(self, key: str, compute: Callable[[], Any], ttl: float,
+                        wait_timeout: float) -> Any:
+        deadline = time.monotonic() + wait_timeout
+        while True:
+            if self._acquire_lease(key):
+                try:
+                    # Another process may have finished between our miss and the lease
+                    value = self.get(key)
+                    if value is None:
+                        value = compute()
+                        self.set(key, value, ttl)
+                    return value
+                finally:
+                    self._release_lease(key)
+
+            self.coalesced += 1
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                value = self.get(key)
+                if value is not None:
+                    return value
+                if not self._lease_held(key):
+                    break  # The leader gave up or crashed; try to take over
+            else:
+                raise TimeoutError(f"Timed out waiting for {key!r}")
+
+    def _lease_held(self, key: str) -> bool:
+        row = self._connect().execute('SELECT 1 FROM leases WHERE key = ? AND expires_at > ?',
+                                      (key, time.time())).fetchone()
+        return row is not None
+
+    def stats(self) -> Dict:
+        entries = self._connect().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'coalesced': self.coalesced + self._single_flight.coalesced
+        }
+
+
+def cache_from_url(url: str, max_entries: int = 1024) -> CacheBackend:
+    """Build a backend from a URL: 'memory' or 'sqlite:///path/to/cache.db'"""
+    if not url or url == 'memory':
+        return LocalLRUCache(max_entries=max_entries)
+    if url.startswith('sqlite:///'):
+        return SQLiteCache(url[len('sqlite:///'):], max_entries=max_entries)
+    raise ValueError(f"Unsupported cache backend: {url}")
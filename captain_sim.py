@@ -0,0 +1,221 @@
+"""Monte Carlo captain / vice-captain simulator.
+
+Each player's fantasy points per match are drawn from a gamma distribution
+whose mean is the player's form-adjusted expected points (scaled by their
+matchup ratings) and whose spread comes from the match-to-match variation
+in their recent scores and wickets. A shared per-trial "match conditions"
+factor makes batters' scores move together (and bowlers' against them),
+so pair upside is not just the sum of two independent players.
+
+Trials are vectorized with NumPy and split into fixed-size chunks. Every
+chunk gets its own child of one SeedSequence, so a seeded run returns the
+same numbers no matter how many worker processes ran the chunks. Each
+chunk returns per-pair sums and fixed-bin histograms, which merge by
+addition, and percentiles are read off the merged histogram.
+"""
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+CAPTAIN_MULTIPLIER = 2.0
+VICE_CAPTAIN_MULTIPLIER = 1.5
+
+# Spread of the shared match-conditions factor (log scale) and how each
+# role group responds to it: high-scoring games help batters, hurt bowlers
+CONDITION_SIGMA = 0.15
+CONDITION_EXPOSURE = {'WK': 1.0, 'BAT': 1.0, 'AR': 0.0, 'BOWL': -1.0}
+
+# A haul worth captaining: share of trials where a player scores at least this
+CONSISTENCY_POINTS = 25
+
+
+class SimPlayer(NamedTuple):
+    key: str
+    name: str
+    team: str
+    group: str       # fantasy role group (WK/BAT/AR/BOWL)
+    mean: float      # expected fantasy points
+    cv: float        # coefficient of variation of points per match
+
+
+class PairResult(NamedTuple):
+    captain: str
+    vice_captain: str
+    expected: float
+    p10: float
+    p50: float
+    p90: float
+
+
+def matchup_rating(player: Dict, conditions: Dict = None) -> Optional[float]:
+    """0-100 matchup rating from vs_pace / vs_spin / death_eff (pitch-weighted)"""
+    conditions = conditions or {}
+    ratings = []
+    if 'vs_pace' in player and 'vs_spin' in player:
+        pace = conditions.get('pace_support', 50)
+        spin = conditions.get('spin_support', 50)
+        ratings.append((player['vs_pace'] * pace + player['vs_spin'] * spin) / (pace + spin))
+    if 'death_eff' in player:
+        ratings.append(player['death_eff'])
+    return sum(ratings) / len(ratings) if ratings else None
+
+
+def build_sim_player(key: str, player: Dict, group: str, expected: float,
+                     conditions: Dict = None) -> SimPlayer:
+    """Turn a player record and their expected points into a distribution"""
+    rating = matchup_rating(player, conditions)
+    mean = expected * (1 + (rating - 80) / 200) if rating is not None else expected
+
+    # Per-match points proxy from the recent windows: runs + 25 per wicket
+    scores = player.get('recent_scores', [])
+    wickets = player.get('recent_wickets', [])
+    matches = max(len(scores), len(wickets))
+    history = [(scores[i] if i < len(scores) else 0) + 25 * (wickets[i] if i < len(wickets) else 0)
+               for i in range(matches)]
+    if len(history) >= 2 and np.mean(history) > 0:
+        cv = float(np.std(history) / np.mean(history))
+    else:
+        cv = 1.0
+    return SimPlayer(key, player['name'], player['team'], group, max(mean, 0.1),
+                     min(max(cv, 0.3), 1.5))
+
+
+def _pairs(count: int) -> tuple:
+    captains, vices = np.meshgrid(np.arange(count), np.arange(count), indexing='ij')
+    mask = captains != vices
+    return captains[mask], vices[mask]
+
+
+def _simulate_chunk(task: tuple) -> tuple:
+    """Run one chunk of trials: per-pair sums and histograms, per-player stats"""
+    means, cvs, exposure, seed, trials, bin_width, bins = task
+    rng = np.random.default_rng(seed)
+
+    # Gamma with the requested mean and CV: shape k = 1/cv^2, scale = mean/k
+    shape = 1.0 / cvs ** 2
+    points = rng.gamma(shape[:, None], (means / shape)[:, None], size=(len(means), trials))
+
+    # Shared conditions factor, normalized so each player's mean is unchanged
+    condition = rng.normal(0.0, CONDITION_SIGMA, size=trials)
+    points *= np.exp(exposure[:, None] * condition[None, :]
+                     - (exposure[:, None] * CONDITION_SIGMA) ** 2 / 2)
+
+    captains, vices = _pairs(len(means))
+    totals = CAPTAIN_MULTIPLIER * points[captains] + VICE_CAPTAIN_MULTIPLIER * points[vices]
+
+    bucket = np.minimum((totals / bin_width).astype(np.int64), bins - 1)
+    bucket += (np.arange(len(captains)) * bins)[:, None]
+    histogram = np.bincount(bucket.ravel(), minlength=len(captains) * bins).reshape(len(captains), bins)
+    return (totals.sum(axis=1), histogram, points.sum(axis=1),
+            (points >= CONSISTENCY_POINTS).sum(axis=1))
+
+
+def _ready(_) -> bool:
+    return True
+
+
+class CaptainSimulator:
+    """Ranks C/VC pairs by simulated expected points and upside percentiles.
+
+    `workers` > 1 spreads chunks over a process pool; with 0 or 1 everything
+    runs in-process. Call `start()` before the process starts any threads:
+    workers are forked then, all at once, from a single-threaded parent
+    (otherwise the pool is started on first use). Pass `seed` to `simulate`
+    for deterministic results.
+    """
+
+    def __init__(self, trials: int = 100_000, chunk_size: int = 10_000, workers: int = None,
+                 bin_width: float = 1.0, max_points: float = 1000.0, start_method: str = None):
+        self.trials = trials
+        self.chunk_size = chunk_size
+        self.workers = min(os.cpu_count() or 1, 8) if workers is None else workers
+        self.bin_width = bin_width
+        self.bins = int(math.ceil(max_points / bin_width)) + 1
+        self.start_method = start_method or (
+            'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def start(self):
+        """Create the worker pool and wait until every worker is up"""
+        pool = self.pool
+        if pool is not None:
+            list(pool.map(_ready, range(self.workers)))
+
+    @property
+    def pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 1:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method))
+            return self._pool
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def stats(self) -> Dict:
+        return {'trials': self.trials, 'workers': self.workers if self.workers > 1 else 0,
+                'pool_started': self._pool is not None}
+
+    def simulate(self, players: List[SimPlayer], seed: int = None, trials: int = None) -> Dict:
+        """Simulate `trials` matches; returns ranked pairs and per-player stats"""
+        trials = trials or self.trials
+        if len(players) < 2:
+            return {'trials': 0, 'pairs': [], 'players': {}}
+
+        means = np.array([p.mean for p in players])
+        cvs = np.array([p.cv for p in players])
+        exposure = np.array([CONDITION_EXPOSURE.get(p.group, 0.0) for p in players])
+
+        sizes = [self.chunk_size] * (trials // self.chunk_size)
+        if trials % self.chunk_size:
+            sizes.append(trials % self.chunk_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(means, cvs, exposure, child, size, self.bin_width, self.bins)
+                 for child, size in zip(seeds, sizes)]
+
+        pool = self.pool if len(tasks) > 1 else None
+        results = pool.map(_simulate_chunk, tasks) if pool else map(_simulate_chunk, tasks)
+
+        pair_sums = histogram = player_sums = hauls = None
+        for sums, hist, p_sums, p_hauls in results:
+            if pair_sums is None:
+                pair_sums, histogram, player_sums, hauls = sums, hist, p_sums, p_hauls
+            else:
+                pair_sums = pair_sums + sums
+                histogram = histogram + hist
+                player_sums = player_sums + p_sums
+                hauls = hauls + p_hauls
+
+        cumulative = np.cumsum(histogram, axis=1)
+        captains, vices = _pairs(len(players))
+
+        def percentile(q: float) -> np.ndarray:
+            # Upper edge of the first bin reaching the quantile
+            index = (cumulative < q * trials).sum(axis=1)
+            return (index + 1) * self.bin_width
+
+        p10, p50, p90 = percentile(0.1), percentile(0.5), percentile(0.9)
+        pairs = [PairResult(players[c].key, players[v].key, round(float(total / trials), 1),
+                            float(low), float(mid), float(high))
+                 for c, v, total, low, mid, high in zip(captains, vices, pair_sums, p10, p50, p90)]
+        pairs.sort(key=lambda pair: (-pair.expected, -pair.p90))
+
+        return {
+            'trials': trials,
+            'pairs': pairs,
+            'players': {p.key: {'expected': round(float(total / trials), 1),
+                                'consistency': round(float(haul / trials), 3)}
+                        for p, total, haul in zip(players, player_sums, hauls)}
+        }
@@ -5,6 +5,16 @@ class CleanCricketAI {
     constructor() {
         this.API_URL = 'http://localhost:5000/api';
         this.isTyping = false;
+        this.dashboardVersion = null;
+        this.dashboardETag = null;
+        // Live scores are pushed over SSE by the asyncio push server (one
+        // thread for every viewer); polling is only the fallback
+        this.LIVE_PUSH_URL = window.CRICKET_LIVE_PUSH_URL || 'http://localhost:5001/api/live/subscribe';
+        this.liveSource = null;
+        this.liveMatches = [];
+        this.pollTimer = null;
+        // Server-side conversation session, so follow-ups keep their context
+        this.sessionId = window.sessionStorage?.getItem('cricketSessionId') || null;
         
         // Wait for page to load
         if (document.readyState === 'loading') {
@@ -29,11 +39,9 @@ class CleanCricketAI {
         // Setup quick action buttons
         this.setupQuickActions();
         
-        // Load live data immediately
+        // Load live data immediately, then follow pushed updates
         this.loadLiveData();
-        
-        // Auto-refresh every 30 seconds
-        setInterval(() => this.loadLiveData(), 30000);
+        this.startLiveUpdates();
         
         console.log('🚀 Cricket AI ready!');
     }
@@ -85,18 +93,26 @@ class CleanCricketAI {
         this.showTyping();
         
         try {
-            const response = await fetch(`${this.API_URL}/chat`, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ message: message })
-            });
-            
-            const data = await response.json();
+            // Render the answer as it streams in; fall back to the plain endpoint
+            const streamed = await this.streamMessage(message);
             
-            if (data.response) {
-                this.addMessage(data.response, 'ai');
-            } else {
-                this.addMessage('Sorry, I had trouble understanding that. Can you try asking about IPL matches or players?', 'ai');
+            if (!streamed) {
+                const response = await fetch(`${this.API_URL}/chat`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ message: message, session_id: this.sessionId, session: true })
+                });
+                
+                const data = await response.json();
+                this.setSession(data.session_id);
+                
+                if (response.status === 429) {
+                    this.addMessage(this.rateLimitMessage(data.retry_after), 'ai');
+                } else if (data.response) {
+                    this.addMessage(data.response, 'ai');
+                } else {
+                    this.addMessage('Sorry, I had trouble understanding that. Can you try asking about IPL matches or players?', 'ai');
+                }
             }
             
         } catch (error) {
@@ -107,6 +123,90 @@ class CleanCricketAI {
         this.hideTyping();
     }
     
+    async streamMessage(message) {
+        const response = await fetch(`${this.API_URL}/chat/stream`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ message: message, session_id: this.sessionId, session: true })
+        });
+        if (response.status === 429) {
+            const data = await response.json().catch(() => ({}));
+            this.addMessage(this.rateLimitMessage(data.retry_after), 'ai');
+            return true;
+        }
+        if (!response.ok || !response.body) return false;
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let text = '';
+        let messageDiv = null;
+        let failed = false;
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            
+            // SSE events are separated by a blank line
+            buffer += decoder.decode(value, { stream: true });
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+            
+            for (const raw of events) {
+                const event = this.parseServerEvent(raw);
+                if (event.type === 'token' && event.data?.text) {
+                    text += event.data.text;
+                    if (messageDiv) {
+                        this.updateMessage(messageDiv, text);
+                    } else {
+                        messageDiv = this.addMessage(text, 'ai');
+                    }
+                } else if (event.type === 'done') {
+                    this.setSession(event.data?.session_id);
+                    console.log(`⚡ First token in ${event.data?.ttft_ms}ms`);
+                } else if (event.type === 'error') {
+                    // Don't ask again through /api/chat: say the answer is incomplete
+                    failed = true;
+                    this.setSession(event.data?.session_id);
+                    const notice = `⚠️ ${event.data?.error || 'Something went wrong, please ask again'}`;
+                    if (messageDiv) {
+                        this.updateMessage(messageDiv, `${text}\n\n${notice}`);
+                    } else {
+                        this.addMessage(notice, 'ai');
+                    }
+                }
+            }
+        }
+        return Boolean(text) || failed;
+    }
+    
+    rateLimitMessage(retryAfter) {
+        const wait = retryAfter ? ` in ${Math.ceil(retryAfter)}s` : ' in a moment';
+        return `⏳ Lots of questions coming in! Please try again${wait}.`;
+    }
+    
+    setSession(sessionId) {
+        if (!sessionId || sessionId === this.sessionId) return;
+        this.sessionId = sessionId;
+        window.sessionStorage?.setItem('cricketSessionId', sessionId);
+    }
+    
+    parseServerEvent(raw) {
+        const event = { type: 'message', data: null };
+        raw.split('\n').forEach(line => {
+            if (line.startsWith('event: ')) {
+                event.type = line.slice(7);
+            } else if (line.startsWith('data: ')) {
+                try {
+                    event.data = JSON.parse(line.slice(6));
+                } catch (error) {
+                    event.data = line.slice(6);
+                }
+            }
+        });
+        return event;
+    }
+    
     async handleQuickAction(action, buttonText) {
         console.log(`🎯 Quick action: ${action}`);
         
@@ -127,7 +227,7 @@ class CleanCricketAI {
             const data = await response.json();
             
             if (data.data) {
-                const formattedResponse = this.formatQuickActionResponse(action, data.data);
+                const formattedResponse = this.formatQuickActionResponse(action, data.data, data);
                 this.addMessage(formattedResponse, 'ai');
             } else {
                 this.addMessage(`❌ Sorry, couldn't get ${buttonText.toLowerCase()} right now.`, 'ai');
@@ -139,12 +239,12 @@ class CleanCricketAI {
         }
     }
     
-    formatQuickActionResponse(action, data) {
+    formatQuickActionResponse(action, data, payload = {}) {
         switch (action) {
             case 'best-team':
                 return this.formatBestTeam(data);
             case 'differential-picks':
-                return this.formatDifferentialPicks(data);
+                return this.formatDifferentialPicks(data, payload.ownership);
             case 'captain-options':
                 return this.formatCaptainOptions(data);
             case 'budget-picks':
@@ -158,28 +258,36 @@ class CleanCricketAI {
     
     formatBestTeam(players) {
         let response = '🏏 **Best IPL Team for Today:**\n\n';
-        players.slice(0, 6).forEach((player, index) => {
-            response += `${index + 1}. **${player.name}** (${player.team}) - ${player.role}\n`;
-            response += `   💰 Price: ${player.price} | 📈 Form: ${player.form}%\n`;
+        players.forEach((player, index) => {
+            const badge = player.captain ? ' 👑 (C)' : player.vice_captain ? ' ⭐ (VC)' : '';
+            response += `${index + 1}. **${player.name}**${badge} (${player.team}) - ${player.role}\n`;
+            response += `   💰 Price: ${player.price} | 📈 Form: ${player.form} | 🎯 Exp. points: ${player.expected_points}\n`;
             response += `   📝 ${player.reason}\n\n`;
         });
         return response;
     }
     
-    formatDifferentialPicks(players) {
+    formatDifferentialPicks(players, ownership) {
         let response = '🎯 **IPL Differential Picks:**\n\n';
         players.forEach((player, index) => {
-            response += `${index + 1}. **${player.name}** (${player.team}) - ${player.ownership} owned\n`;
+            const captaincy = player.captaincy ? ` (${player.captaincy} as captain)` : '';
+            response += `${index + 1}. **${player.name}** (${player.team}) - ${player.ownership} owned${captaincy}\n`;
             response += `   💰 Price: ${player.price} | ⚡ Potential: ${player.potential}\n`;
             response += `   📝 ${player.reason}\n\n`;
         });
+        if (ownership && ownership.source === 'submitted') {
+            response += `📊 Ownership from ${ownership.teams.toLocaleString()} recently submitted teams`;
+        } else if (ownership) {
+            response += '📊 Ownership estimated from today\'s top-ranked lineups';
+        }
         return response;
     }
     
     formatCaptainOptions(captains) {
         let response = '👑 **IPL Captain Options:**\n\n';
         captains.forEach((captain, index) => {
-            response += `${index + 1}. **${captain.name}** (${captain.team})\n`;
+            response += `${index + 1}. **${captain.name}** (${captain.team})`;
+            response += captain.vice_captain ? ` + ${captain.vice_captain} (VC)\n` : '\n';
             response += `   📊 Captain Score: ${captain.captaincy} | 🎯 Consistency: ${captain.consistency}\n`;
             response += `   📝 ${captain.reason}\n\n`;
         });
@@ -207,7 +315,7 @@ class CleanCricketAI {
     addMessage(message, sender) {
         if (!this.chatBox) {
             console.log(`${sender}: ${message}`);
-            return;
+            return null;
         }
         
         const messageDiv = document.createElement('div');
@@ -225,6 +333,14 @@ class CleanCricketAI {
             messageDiv.style.opacity = '1';
             messageDiv.style.transform = 'translateY(0)';
         }, 10);
+        
+        return messageDiv;
+    }
+    
+    updateMessage(messageDiv, message) {
+        if (!messageDiv) return;
+        messageDiv.innerHTML = this.formatMessage(message);
+        this.chatBox.scrollTop = this.chatBox.scrollHeight;
     }
     
     formatMessage(message) {
@@ -254,29 +370,21 @@ class CleanCricketAI {
         try {
             console.log('📊 Loading live IPL data...');
             
-            // Load live statistics
-            const statsResponse = await fetch(`${this.API_URL}/live-stats`);
-            const statsData = await statsResponse.json();
-            
-            if (statsData.stats) {
-                this.updateLiveStats(statsData.stats);
-            }
-            
-            // Load match analysis
-            const analysisResponse = await fetch(`${this.API_URL}/match-analysis`);
-            const analysisData = await analysisResponse.json();
+            // One request for stats, analysis and matches; only changed sections come back
+            const params = this.dashboardVersion ? `?since=${encodeURIComponent(this.dashboardVersion)}` : '';
+            const response = await fetch(`${this.API_URL}/dashboard${params}`, {
+                headers: this.dashboardETag ? { 'If-None-Match': this.dashboardETag } : {}
+            });
             
-            if (analysisData.analysis) {
-                this.updateMatchAnalysis(analysisData.analysis);
+            if (response.status === 304) {
+                console.log('✅ Live IPL data unchanged');
+                return;
             }
             
-            // Load live matches for sidebar
-            const matchesResponse = await fetch(`${this.API_URL}/matches`);
-            const matchesData = await matchesResponse.json();
-            
-            if (matchesData.matches) {
-                this.updateLiveMatches(matchesData.matches);
-            }
+            const data = await response.json();
+            this.dashboardVersion = data.version;
+            this.dashboardETag = response.headers.get('ETag');
+            this.applyDashboardSections(data.sections || {});
             
             console.log('✅ Live IPL data loaded');
             
@@ -285,6 +393,78 @@ class CleanCricketAI {
         }
     }
     
+    applyDashboardSections(sections) {
+        if (sections.stats) {
+            this.updateLiveStats(sections.stats);
+        }
+        
+        if (sections.analysis) {
+            this.updateMatchAnalysis(sections.analysis);
+        }
+        
+        if (sections.matches) {
+            this.liveMatches = sections.matches;
+            this.updateLiveMatches(sections.matches);
+        }
+    }
+    
+    startLiveUpdates() {
+        if (!window.EventSource) {
+            this.startPolling();
+            return;
+        }
+        
+        // EventSource reconnects by itself (resuming from the last event id);
+        // poll the dashboard only while the push channel is down
+        const source = new EventSource(this.LIVE_PUSH_URL);
+        this.liveSource = source;
+        source.addEventListener('open', () => this.stopPolling());
+        source.addEventListener('snapshot', (event) => {
+            const data = JSON.parse(event.data);
+            this.stopPolling();
+            this.applyDashboardSections(data.sections || {});
+        });
+        source.addEventListener('delta', (event) => this.applyLiveDelta(JSON.parse(event.data)));
+        source.addEventListener('error', () => {
+            this.startPolling();
+            if (source.readyState === EventSource.CLOSED) {
+                // Refused (e.g. 503, too many subscribers): EventSource won't
+                // reconnect by itself, so try again in a minute
+                this.liveSource = null;
+                setTimeout(() => this.startLiveUpdates(), 60000);
+            }
+        });
+    }
+    
+    applyLiveDelta(delta) {
+        this.applyDashboardSections(delta.sections || {});
+        if (!delta.matches && !delta.removed) return;
+        
+        // Merge changed matches by name, keeping the existing order
+        const changed = new Map((delta.matches || []).map(match => [match.name, match]));
+        const removed = new Set(delta.removed || []);
+        const matches = this.liveMatches
+            .filter(match => !removed.has(match.name))
+            .map(match => changed.get(match.name) || match);
+        const known = new Set(matches.map(match => match.name));
+        changed.forEach((match, name) => {
+            if (!known.has(name)) matches.push(match);
+        });
+        this.liveMatches = matches;
+        this.updateLiveMatches(matches);
+    }
+    
+    startPolling() {
+        if (this.pollTimer) return;
+        this.pollTimer = setInterval(() => this.loadLiveData(), 30000);
+    }
+    
+    stopPolling() {
+        if (!this.pollTimer) return;
+        clearInterval(this.pollTimer);
+        this.pollTimer = null;
+    }
+    
     updateLiveStats(stats) {
         console.log('📈 Updating live stats:', stats);
         
@@ -0,0 +1,318 @@
+"""Incremental player form from ball-by-ball events.
+
+Events are JSON objects, one per line:
+
+    {"type": "ball", "match": "MI-CSK", "batter": "Rohit Sharma", "bowler": "Deepak Chahar",
+     "runs": 4}
+    {"type": "ball", "match": "MI-CSK", "batter": "Rohit Sharma", "bowler": "Deepak Chahar",
+     "runs": 0, "wicket": true, "fielder": "MS Dhoni"}
+    {"type": "match_end", "match": "MI-CSK"}
+
+They can be read from a JSONL file or from a TCP socket. To replay a file
+as a local stand-in for a live feed:
+
+    python form_model.py serve events.jsonl --port 9099 --rate 20
+"""
+import argparse
+import json
+import logging
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fantasy points per event (T20 scoring)
+POINTS = {
+    'run': 1,
+    'four_bonus': 1,
+    'six_bonus': 2,
+    'wicket': 25,
+    'catch': 8
+}
+
+# Roles whose batting scores are tracked even without a batting window yet;
+# a bowler facing a few balls shouldn't get a 'recent scores' form penalty
+BATTING_ROLES = {'Batsman', 'WK-Batsman', 'All-Rounder'}
+
+
+class PlayerForm:
+    """Rolling state for one player: in-progress match totals, ring buffers and EWMA"""
+
+    __slots__ = ('ewma', 'runs', 'wickets', 'points', 'match', 'recent_scores', 'recent_wickets',
+                 'batted', 'bowled', 'match_batted', 'match_bowled')
+
+    def __init__(self, player: Dict, window: int, full_form_points: float):
+        self.ewma = player.get('form', 50) / 100 * full_form_points
+        self.recent_scores = deque(player.get('recent_scores', []), maxlen=window)
+        self.recent_wickets = deque(player.get('recent_wickets', []), maxlen=window)
+        self.batted = 'recent_scores' in player or player.get('role') in BATTING_ROLES
+        self.bowled = 'recent_wickets' in player
+        self.match = None
+        self.match_batted = self.match_bowled = False
+        self.runs = self.wickets = self.points = 0
+
+
+class FormModel:
+    """Updates player form, recent windows and fantasy points in O(1) per event.
+
+    Each player keeps ring buffers of their last `window` completed matches
+    and an exponentially weighted moving average of fantasy points per match
+    (`decay` is the weight of the newest match). While a match is in
+    progress the player's form can only rise with what they've scored so
+    far; the full EWMA update is applied when the match ends. Form is the
+    EWMA on the 0-100 scale of the player database, where
+    `full_form_points` per match is 100.
+
+    `lookup(name)` resolves a name/key to `(key, player record)`; the record
+    is updated in place and `on_update(key, player)` is called so derived
+    views (the columnar store, prebuilt payloads) can refresh.
+    """
+
+    def __init__(self, lookup: Callable[[str], Optional[Tuple[str, Dict]]],
+                 on_update: Callable[[str, Dict], None] = None, window: int = 5,
+                 decay: float = 0.3, full_form_points: float = 60.0):
+        self.lookup = lookup
+        self.on_update = on_update
+        self.window = window
+        self.decay = decay
+        self.full_form_points = full_form_points
+        self._players = {}
+        self._matches = {}  # match id -> keys of players involved
+        self._lock = threading.Lock()
+        self.events = 0
+        self.unknown_players = 0
+        self.bad_events = 0
+
+    def state(self, key: str) -> Optional[PlayerForm]:
+        return self._players.get(key)
+
+    def apply(self, event: Dict):
+        """Apply one event (ball or match_end)"""
+        with self._lock:
+            self.events += 1
+            kind = event.get('type', 'ball')
+            try:
+                if kind == 'ball':
+                    self._ball(event)
+                elif kind == 'match_end':
+                    self._match_end(event['match'])
+                else:
+                    self.bad_events += 1
+            except (KeyError, TypeError, ValueError) as e:
+                self.bad_events += 1
+                logger.warning(f"Skipping bad ball event {event!r}: {e!r}")
+
+    def _ball(self, event: Dict):
+        match = event['match']
+        runs = int(event.get('runs', 0))
+
+        batter = self._involve(event.get('batter'), match)
+        if batter:
+            form, player_key, player = batter
+            form.match_batted = True
+            form.runs += runs
+            form.points += runs * POINTS['run']
+            if runs == 4:
+                form.points += POINTS['four_bonus']
+            elif runs == 6:
+                form.points += POINTS['six_bonus']
+            self._publish(player_key, player, form)
+
+        bowler = self._involve(event.get('bowler'), match)
+        if bowler:
+            form, player_key, player = bowler
+            first_ball = not form.match_bowled
+            form.bowled = form.match_bowled = True
+            if event.get('wicket') and event.get('how') != 'run out':
+                form.wickets += 1
+                form.points += POINTS['wicket']
+                self._publish(player_key, player, form)
+            elif first_ball:
+                self._publish(player_key, player, form)
+
+        if event.get('wicket'):
+            fielder = self._involve(event.get('fielder'), match)
+            if fielder:
+                form, player_key, player = fielder
+                form.points += POINTS['catch']
+                self._publish(player_key, player, form)
+
+    def _involve(self, name: Optional[str], match: str):
+        """(state, key, record) for a player taking part in `match`"""
+        if not name:
+            return None
+        found = self.lookup(name)
+        if found is None:
+            self.unknown_players += 1
+            return None
+        player_key, player = found
+        form = self._players.get(player_key)
+        if form is None:
+            form = self._players[player_key] = PlayerForm(player, self.window, self.full_form_points)
+        if form.match != match:
+            if form.match is not None:
+                self._finish(form)  # missed match_end for their previous match
+            form.match = match
+            self._matches.setdefault(match, set()).add(player_key)
+        return form, player_key, player
+
+    def _match_end(self, match: str):
+        for player_key in self._matches.pop(match, ()):
+            found = self.lookup(player_key)
+            form = self._players[player_key]
+            if form.match == match:
+                self._finish(form)
+                if found:
+                    self._publish(player_key, found[1], form)
+
+    def _finish(self, form: PlayerForm):
+        """Fold the completed match into the ring buffers and the EWMA"""
+        if form.match_batted and form.batted:
+            form.recent_scores.append(form.runs)
+        if form.match_bowled:
+            form.recent_wickets.append(form.wickets)
+        form.ewma += self.decay * (form.points - form.ewma)
+        form.match = None
+        form.match_batted = form.match_bowled = False
+        form.runs = form.wickets = form.points = 0
+
+    def current_form(self, form: PlayerForm) -> int:
+        ewma = form.ewma
+        if form.match is not None and form.points > ewma:
+            ewma += self.decay * (form.points - ewma)
+        return int(round(min(100.0, max(0.0, 100 * ewma / self.full_form_points))))
+
+    def _publish(self, player_key: str, player: Dict, form: PlayerForm):
+        """Write the live view into the player record and notify listeners"""
+        player['form'] = self.current_form(form)
+        in_progress = form.match is not None
+        if form.batted:
+            scores = list(form.recent_scores) + ([form.runs] if in_progress and form.match_batted else [])
+            player['recent_scores'] = scores[-self.window:]
+        if form.bowled:
+            wickets = list(form.recent_wickets) + ([form.wickets] if in_progress and form.match_bowled else [])
+            player['recent_wickets'] = wickets[-self.window:]
+        player['live_points'] = form.points if in_progress else 0
+        if self.on_update:
+            self.on_update(player_key, player)
+
+    def stats(self) -> Dict:
+        return {
+            'events': self.events,
+            'players_tracked': len(self._players),
+            'matches_in_progress': len(self._matches),
+            'unknown_players': self.unknown_players,
+            'bad_events': self.bad_events
+        }
+
+
+def read_jsonl(path: str, follow: bool = False, poll_interval: float = 0.5,
+               stop: threading.Event = None) -> Iterator[Dict]:
+    """Events from a JSONL file; with `follow`, keep tailing it for new lines"""
+    with open(path) as f:
+        buffer = ''
+        while stop is None or not stop.is_set():
+            line = f.readline()
+            if not line:
+                if not follow:
+                    break
+                time.sleep(poll_interval)
+                continue
+            buffer += line
+            if not buffer.endswith('\n') and follow:
+                continue  # partial line still being written
+            text, buffer = buffer.strip(), ''
+            if text:
+                yield json.loads(text)
+
+
+def read_socket(host: str, port: int, stop: threading.Event = None,
+                reconnect_delay: float = 2.0) -> Iterator[Dict]:
+    """Events from a newline-delimited JSON TCP feed, reconnecting when it drops"""
+    while stop is None or not stop.is_set():
+        try:
+            with socket.create_connection((host, port), timeout=10) as conn:
+                conn.settimeout(None)
+                with conn.makefile('r') as stream:
+                    for line in stream:
+                        if line.strip():
+                            yield json.loads(line)
+        except OSError as e:
+            logger.warning(f"Ball-by-ball feed {host}:{port} unavailable: {e}")
+        if stop is not None and stop.wait(reconnect_delay):
+            break
+
+
+def event_source(url: str, stop: threading.Event = None) -> Iterable[Dict]:
+    """Build an event iterator from 'file:///path.jsonl' or 'tcp://host:port'"""
+    if url.startswith('file://'):
+        return read_jsonl(url[len('file://'):], follow=True, stop=stop)
+    if url.startswith('tcp://'):
+        host, port = url[len('tcp://'):].rsplit(':', 1)
+        return read_socket(host, int(port), stop=stop)
+    raise ValueError(f"Unsupported ball-by-ball source: {url}")
+
+
+class EventIngestor:
+    """Feeds events from a source into a FormModel on a background thread"""
+
+    def __init__(self, model: FormModel, url: str):
+        self.model = model
+        self.url = url
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='ball-events', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        try:
+            for event in event_source(self.url, stop=self._stop):
+                if self._stop.is_set():
+                    break
+                self.model.apply(event)
+        except Exception as e:
+            logger.error(f"Ball-by-ball ingestion from {self.url} stopped: {e!r}")
+
+
+def serve(path: str, host: str, port: int, rate: float):
+    """Replay a JSONL file to every client that connects, `rate` events per second"""
+
+    class ReplayHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for event in read_jsonl(path):
+                self.wfile.write((json.dumps(event) + '\n').encode())
+                self.wfile.flush()
+                if rate:
+                    time.sleep(1 / rate)
+
+    with socketserver.ThreadingTCPServer((host, port), ReplayHandler) as server:
+        print(f"Replaying {path} on tcp://{host}:{port}")
+        server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ball-by-ball feed tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help='replay a JSONL file over TCP')
+    serve_parser.add_argument('path')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=9099)
+    serve_parser.add_argument('--rate', type=float, default=10.0, help='events per second (0 = no delay)')
+    args = parser.parse_args()
+    serve(args.path, args.host, args.port, args.rate)
+
+
+if __name__ == '__main__':
+    main()
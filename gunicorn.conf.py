@@ -0,0 +1,37 @@
+"""gunicorn settings: gunicorn -c gunicorn.conf.py wsgi:app"""
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+
+# One process by default: chat sessions, per-client rate limits and team
+# ownership are kept in memory per process, so with more workers follow-ups
+# lose context on another worker, each client gets N times its rate, and
+# differential picks depend on which worker answers. Each worker also forks
+# its own Monte Carlo pool. Provider calls are I/O and the numeric work runs
+# in NumPy or the Monte Carlo pool, so threads carry the concurrency.
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+
+# Every held connection takes a thread for its whole life, so the default
+# pool covers the caps on held connections plus 16 threads for short requests:
+#   LLM_MAX_CONCURRENCY + LLM_MAX_QUEUE  chat streams on (or queued for) a provider
+#   LIVE_SUBSCRIBE_MAX                   SSE subscribers when the push server is off
+#   DASHBOARD_WAIT_MAX                   /api/dashboard?wait= long-polls
+# Past those caps requests are shed (cached/rule-based answer, 503) rather than
+# holding a thread. The defaults below must match server.py.
+HELD_CONNECTION_LIMITS = {'LLM_MAX_CONCURRENCY': 16, 'LLM_MAX_QUEUE': 0,
+                          'LIVE_SUBSCRIBE_MAX': 8, 'DASHBOARD_WAIT_MAX': 16}
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS') or
+              sum(int(os.getenv(name, default)) for name, default in HELD_CONNECTION_LIMITS.items()) + 16)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+
+# Build shared state once in the master (wsgi.py) and fork workers from it
+preload_app = True
+
+
+def post_worker_init(worker):
+    """Start the worker's background work: live-data refresher, live push server
+    (LIVE_PUSH_PORT, default 5001, shared by all workers), ball-by-ball ingestor
+    and Monte Carlo pool"""
+    from server import create_app
+    create_app()
@@ -0,0 +1,223 @@
+"""Historical per-match player performances in a memory-mapped SQLite file.
+
+One row per player per match. Venue and head-to-head splits are answered
+from covering indexes, so a lookup only reads index pages. The file is
+opened read-only on first use with mmap enabled, so every worker on a host
+shares the same page-cache pages and startup pays nothing.
+
+Build or extend the database from CSV or JSON/JSONL exports:
+
+    python history_store.py import history.db ipl_2008_2023.csv more_matches.jsonl
+
+Columns (CSV header or JSON keys): player, match_id, date, venue,
+opposition (team code, e.g. CSK), runs, balls, wickets, overs,
+runs_conceded, catches, points.
+`player` is a database key ("virat_kohli") or a full name ("Virat Kohli").
+Missing numeric columns default to 0; missing points are derived from
+runs, wickets and catches.
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS innings (
+        player TEXT NOT NULL,
+        match_id TEXT NOT NULL,
+        date TEXT,
+        venue TEXT,
+        opposition TEXT,
+        runs INTEGER NOT NULL DEFAULT 0,
+        balls INTEGER NOT NULL DEFAULT 0,
+        wickets INTEGER NOT NULL DEFAULT 0,
+        overs REAL NOT NULL DEFAULT 0,
+        runs_conceded INTEGER NOT NULL DEFAULT 0,
+        catches INTEGER NOT NULL DEFAULT 0,
+        points REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (player, match_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS innings_venue
+        ON innings (player, venue, points, runs, wickets);
+    CREATE INDEX IF NOT EXISTS innings_opposition
+        ON innings (player, opposition, points, runs, wickets);
+    CREATE INDEX IF NOT EXISTS innings_overall
+        ON innings (player, points, runs, wickets);
+"""
+
+NUMERIC_COLUMNS = ('runs', 'balls', 'wickets', 'overs', 'runs_conceded', 'catches', 'points')
+
+
+def player_key(name: str) -> str:
+    """'Virat Kohli' / 'virat_kohli' -> 'virat_kohli'"""
+    return '_'.join(name.strip().lower().replace('_', ' ').split())
+
+
+def place_key(name: str) -> str:
+    """'Wankhede Stadium, Mumbai' -> 'wankhede stadium' (so both spellings match)"""
+    return ' '.join((name or '').split(',')[0].lower().split())
+
+
+def fantasy_points(row: Dict) -> float:
+    """T20 fantasy points for one match when the export doesn't include them"""
+    runs = row['runs']
+    return runs + (8 if runs >= 50 else 0) + (8 if runs >= 100 else 0) + \
+        25 * row['wickets'] + 8 * row['catches']
+
+
+class HistoryStore:
+    """Read-only, lazily opened view of the history database"""
+
+    def __init__(self, path: str, mmap_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.mmap_bytes = mmap_bytes
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """One read-only connection per thread and process, opened on first query"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute(f'PRAGMA mmap_size={int(self.mmap_bytes)}')
+            conn.execute('PRAGMA query_only=1')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _split(self, column: str, player: str, value: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            f'SELECT COUNT(*), AVG(points), AVG(runs), AVG(wickets) FROM innings '
+            f'WHERE player = ? AND {column} = ?', (player, place_key(value))).fetchone()
+        return self._summary(row)
+
+    def _splits(self, column: str, players: List[str], value: str) -> Dict[str, Dict]:
+        if not players:
+            return {}
+        marks = ','.join('?' * len(players))
+        rows = self._connect().execute(
+            f'SELECT player, COUNT(*), AVG(points), AVG(runs), AVG(wickets) FROM innings '
+            f'WHERE player IN ({marks}) AND {column} = ? GROUP BY player',
+            (*players, place_key(value))).fetchall()
+        return {row[0]: self._summary(row[1:]) for row in rows}
+
+    @staticmethod
+    def _summary(row) -> Optional[Dict]:
+        if not row or not row[0]:
+            return None
+        matches, points, runs, wickets = row
+        return {'matches': matches, 'avg_points': round(points, 1),
+                'avg_runs': round(runs, 1), 'avg_wickets': round(wickets, 2)}
+
+    def venue_split(self, player: str, venue: str) -> Optional[Dict]:
+        """Averages for a player at a venue (None without history there)"""
+        return self._split('venue', player, venue)
+
+    def head_to_head(self, player: str, opposition: str) -> Optional[Dict]:
+        """Averages for a player against a team"""
+        return self._split('opposition', player, opposition)
+
+    def venue_splits(self, players: List[str], venue: str) -> Dict[str, Dict]:
+        """venue_split for many players in one query"""
+        return self._splits('venue', players, venue)
+
+    def head_to_heads(self, players: List[str], opposition: str) -> Dict[str, Dict]:
+        """head_to_head for many players in one query"""
+        return self._splits('opposition', players, opposition)
+
+    def career(self, player: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            'SELECT COUNT(*), AVG(points), AVG(runs), AVG(wickets) FROM innings WHERE player = ?',
+            (player,)).fetchone()
+        return self._summary(row)
+
+    def recent(self, player: str, limit: int = 5) -> List[Dict]:
+        """Most recent matches first"""
+        rows = self._connect().execute(
+            'SELECT match_id, date, venue, opposition, runs, wickets, points FROM innings '
+            'WHERE player = ? ORDER BY date DESC LIMIT ?', (player, limit)).fetchall()
+        keys = ('match_id', 'date', 'venue', 'opposition', 'runs', 'wickets', 'points')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def stats(self) -> Dict:
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {'path': self.path, 'bytes': size}
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    """Rows from a CSV (with header), JSON array or JSONL file"""
+    if path.endswith('.csv'):
+        with open(path, newline='') as f:
+            yield from csv.DictReader(f)
+        return
+    with open(path) as f:
+        first = f.read(1)
+        f.seek(0)
+        if first == '[':
+            yield from json.load(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def normalize_record(record: Dict) -> Dict:
+    row = {'player': player_key(record['player']), 'match_id': str(record['match_id']),
+           'date': record.get('date') or None,
+           'venue': place_key(record.get('venue')), 'opposition': place_key(record.get('opposition'))}
+    for column in NUMERIC_COLUMNS:
+        value = record.get(column)
+        if value in (None, ''):
+            row[column] = 0
+        elif column in ('overs', 'points'):
+            row[column] = float(value)
+        else:
+            row[column] = int(float(value))
+    if record.get('points') in (None, ''):
+        row['points'] = fantasy_points(row)
+    return row
+
+
+def import_records(path: str, records: Iterable[Dict], batch_size: int = 5000) -> int:
+    """Upsert records into the database (created if missing); returns rows written"""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    columns = ('player', 'match_id', 'date', 'venue', 'opposition') + NUMERIC_COLUMNS
+    sql = (f"INSERT OR REPLACE INTO innings ({', '.join(columns)}) "
+           f"VALUES ({', '.join('?' * len(columns))})")
+    written = 0
+    batch = []
+    with conn:
+        for record in records:
+            row = normalize_record(record)
+            batch.append(tuple(row[c] for c in columns))
+            if len(batch) >= batch_size:
+                conn.executemany(sql, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            conn.executemany(sql, batch)
+            written += len(batch)
+    conn.execute('ANALYZE')
+    conn.execute('VACUUM')
+    conn.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Player history database tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help='import CSV/JSON/JSONL match records')
+    import_parser.add_argument('database')
+    import_parser.add_argument('files', nargs='+')
+    args = parser.parse_args()
+
+    for path in args.files:
+        written = import_records(args.database, read_records(path))
+        print(f"{path}: {written} rows")
+
+
+if __name__ == '__main__':
+    main()
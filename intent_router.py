@@ -0,0 +1,115 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+class Route(NamedTuple):
+    intent: str
+    players: List[str]
+    keywords: List[str]
+
+
+def normalize(text: str) -> str:
+    """Lowercase, turn punctuation into spaces and pad so every word has boundaries"""
+    return f" {_NON_WORD.sub(' ', text.lower()).strip()} "
+
+
+class IntentRouter:
+    """Single-pass intent and player detection using an Aho–Corasick automaton.
+
+    Intent keywords and player aliases are compiled once into one automaton
+    over whole words (patterns are padded with spaces, so "team" no longer
+    matches inside "steam"). Routing a message is one walk over its
+    characters no matter how many intents or players are registered.
+
+    `priority` orders the keyword intents; two or more players make the query
+    a `compare_intent`, a single player a `player_intent`, and anything else
+    is `default_intent`.
+    """
+
+    def __init__(self, intent_keywords: Dict[str, Iterable[str]], player_aliases: Dict[str, str],
+                 priority: List[str] = None, compare_intent: str = 'compare',
+                 player_intent: str = 'player', default_intent: str = 'general'):
+        self.priority = list(priority or intent_keywords)
+        self.rank = {intent: i for i, intent in enumerate(self.priority)}
+        self.compare_intent = compare_intent
+        self.player_intent = player_intent
+        self.default_intent = default_intent
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]  # state -> [(pattern length, kind, value)]
+
+        for intent, keywords in intent_keywords.items():
+            for keyword in keywords:
+                self._add(normalize(keyword), ('intent', intent))
+        for alias, player_key in player_aliases.items():
+            self._add(normalize(alias), ('player', player_key))
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def _add(self, pattern: str, payload: Tuple[str, str]):
+        state = 0
+        for char in pattern:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = nxt
+        self._output[state].append((len(pattern), payload[0], payload[1]))
+
+    def _build(self):
+        """Compute failure links breadth-first and merge suffix outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def scan(self, text: str) -> List[Tuple[int, str, str]]:
+        """Return (start, kind, value) for every pattern occurrence in text"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        matches = []
+        state = 0
+        for position, char in enumerate(normalize(text)):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, kind, value in output[state]:
+                matches.append((position - length + 1, kind, value))
+        return matches
+
+    def route(self, text: str) -> Route:
+        """Resolve the intent and the players mentioned (in order of mention)"""
+        players = []
+        keywords = set()
+        for _, kind, value in sorted(self.scan(text)):
+            if kind == 'player':
+                if value not in players:
+                    players.append(value)
+            else:
+                keywords.add(value)
+
+        if len(players) >= 2:
+            intent = self.compare_intent
+        elif keywords:
+            intent = min(keywords, key=self.rank.__getitem__)
+        elif players:
+            intent = self.player_intent
+        else:
+            intent = self.default_intent
+        return Route(intent, players, sorted(keywords, key=self.rank.__getitem__))
@@ -0,0 +1,287 @@
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LiveSnapshot:
+    """One published view of the live data. Never mutated after publishing."""
+    version: str
+    fetched_at: float
+    data: Dict = field(repr=False)
+    sources: Tuple[str, ...] = ()
+    versions: Dict = field(default_factory=dict)  # top-level key (and 'match_state') -> content hash
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class FeedSource:
+    """Base class for live match data sources"""
+
+    name = 'source'
+
+    def fetch(self) -> Dict:
+        """Return {'matches': [...]} (other keys are optional)"""
+        raise NotImplementedError
+
+
+class HTTPFeedSource(FeedSource):
+    """JSON feed fetched over a pooled, keep-alive HTTP session"""
+
+    def __init__(self, name: str, url: str, headers: Dict = None, params: Dict = None,
+                 timeout: float = 5.0, pool_size: int = 4):
+        self.name = name
+        self.url = url
+        self.params = params or {}
+        self.timeout = timeout
+        # Imported here so only deployments with a real feed pay for it at startup
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self) -> Dict:
+        response = self.session.get(self.url, params=self.params, timeout=self.timeout)
+        response.raise_for_status()
+        payload = response.json()
+        matches = payload.get('matches') or payload.get('data') or []
+        # Keep only entries that look like the match records the API serves
+        return {'matches': [m for m in matches if isinstance(m, dict) and 'name' in m]}
+
+
+class FakeLiveFeed(FeedSource):
+    """Local stand-in for the live feed (demo data), with injectable latency and failures"""
+
+    def __init__(self, name: str = 'demo', latency: float = 0.0, failure_rate: float = 0.0,
+                 matches: List[Dict] = None, seed: int = None):
+        self.name = name
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.matches = matches
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def fetch(self) -> Dict:
+        self.calls += 1
+        time.sleep(self.latency)
+        if self._random.random() < self.failure_rate:
+            raise ConnectionError(f"{self.name} injected failure")
+        if self.matches is not None:
+            return {'matches': list(self.matches)}
+
+        current_time = datetime.now()
+        return {
+            'matches': [
+                {
+                    'name': 'Mumbai Indians vs Chennai Super Kings',
+                    'venue': 'Wankhede Stadium, Mumbai',
+                    'status': 'Live',
+                    'score': 'MI: 156/4 (18.2) vs CSK: 145/6 (20)',
+                    'time': current_time.strftime('%H:%M')
+                },
+                {
+                    'name': 'Royal Challengers Bangalore vs Kolkata Knight Riders',
+                    'venue': 'M. Chinnaswamy Stadium, Bangalore',
+                    'status': 'Upcoming',
+                    'score': None,
+                    'time': (current_time + timedelta(hours=4)).strftime('%H:%M')
+                },
+                {
+                    'name': 'Delhi Capitals vs Rajasthan Royals',
+                    'venue': 'Arun Jaitley Stadium, Delhi',
+                    'status': 'Concluded',
+                    'score': 'DC: 189/6 (20) beat RR: 142/9 (20)',
+                    'time': (current_time - timedelta(hours=2)).strftime('%H:%M')
+                }
+            ]
+        }
+
+
+class DemoStatsFeed(FeedSource):
+    """Platform stats, weather and pitch report for the dashboard (demo values)"""
+
+    name = 'demo-stats'
+
+    def __init__(self, seed: int = None):
+        self._random = random.Random(seed)
+
+    def fetch(self) -> Dict:
+        rng = self._random
+        return {
+            'matches': [],
+            'stats': {
+                'active_users': rng.randint(15000, 25000),
+                'teams_created': rng.randint(45000, 65000),
+                'success_rate': rng.randint(68, 85),
+                'live_contests': rng.randint(150, 300)
+            },
+            'weather': {
+                'temperature': f"{rng.randint(25, 35)}°C",
+                'wind_speed': f"{rng.randint(10, 25)} km/h",
+                'humidity': f"{rng.randint(45, 75)}%"
+            },
+            'pitch_report': {
+                'batting_friendly': rng.randint(60, 85),
+                'pace_support': rng.randint(70, 90),
+                'spin_support': rng.randint(65, 85)
+            }
+        }
+
+
+class LiveDataRefresher:
+    """Refreshes live data in the background and publishes immutable snapshots.
+
+    Readers only ever do `refresher.snapshot` (a single attribute read); the
+    refresher builds a complete new LiveSnapshot off to the side and swaps
+    the reference in one assignment. Sources are fetched in parallel and a
+    failed source doesn't block the others. `get()` serves the current
+    snapshot even when it is stale and kicks off at most one revalidation.
+    """
+
+    EMPTY = {'matches': [], 'stats': {}, 'weather': {}, 'pitch_report': {}}
+    # Match fields that change without the match changing (the demo feed's clock)
+    VOLATILE_MATCH_FIELDS = ('time',)
+
+    def __init__(self, sources: List[FeedSource], interval: float = 30.0, cache=None,
+                 cache_key: str = 'live-snapshot'):
+        self.sources = sources
+        self.interval = interval
+        # Optional CacheBackend shared by worker processes so only one of them fetches
+        self.cache = cache
+        self.cache_key = cache_key
+        self.snapshot: Optional[LiveSnapshot] = None
+        self._published = threading.Condition()
+        self._refresh_lock = threading.Lock()
+        self._revalidate_lock = threading.Lock()
+        self._revalidated_at = float('-inf')  # monotonic time of the last revalidation started
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(sources)),
+                                            thread_name_prefix='live-feed')
+
+    def start(self):
+        """Start the background refresh loop (idempotent)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='live-data-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def get(self) -> LiveSnapshot:
+        """Current snapshot; stale data is served while a refresh runs in the background"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            return self.refresh(wait=True)
+        if snapshot.age() >= self.interval and self._claim_revalidation():
+            threading.Thread(target=self.refresh, name='live-data-revalidate', daemon=True).start()
+        return snapshot
+
+    def _claim_revalidation(self) -> bool:
+        """True for the one caller that should start a revalidation now.
+
+        False while a refresh is running or within `interval` of the last
+        attempt, so a snapshot that stays stale (all sources failing, or an
+        older copy from the shared cache) doesn't start a thread per request.
+        """
+        now = time.monotonic()
+        with self._revalidate_lock:
+            if self._refresh_lock.locked() or now - self._revalidated_at < self.interval:
+                return False
+            self._revalidated_at = now
+            return True
+
+    def refresh(self, wait: bool = False) -> LiveSnapshot:
+        """Fetch all sources and publish a new snapshot (single-flight)"""
+        if not self._refresh_lock.acquire(blocking=wait):
+            # Someone else is already refreshing; they'll publish for everyone
+            return self.snapshot
+        try:
+            if wait and self.snapshot is not None and self.snapshot.age() < self.interval:
+                return self.snapshot
+            if self.cache is not None:
+                payload = self.cache.get_or_compute(
+                    self.cache_key, lambda: asdict(self._fetch_snapshot()), ttl=self.interval)
+                snapshot = LiveSnapshot(**dict(payload, sources=tuple(payload['sources'])))
+            else:
+                snapshot = self._fetch_snapshot()
+
+            with self._published:
+                self.snapshot = snapshot
+                self._published.notify_all()
+            return snapshot
+        finally:
+            self._refresh_lock.release()
+
+    def wait_for_update(self, fetched_after: float, timeout: float) -> Optional[LiveSnapshot]:
+        """Block until a snapshot newer than `fetched_after` is published (long-polling)"""
+        with self._published:
+            self._published.wait_for(
+                lambda: self.snapshot is not None and self.snapshot.fetched_at > fetched_after,
+                timeout=timeout)
+            return self.snapshot
+
+    def _fetch_snapshot(self) -> LiveSnapshot:
+        results = self._fetch_all()
+        if not results and self.snapshot is not None:
+            logger.warning("All live feeds failed, keeping previous snapshot")
+            return self.snapshot
+        return self.build_snapshot(results)
+
+    def _fetch_all(self) -> List[Tuple[str, Dict]]:
+        futures = [(source.name, self._executor.submit(source.fetch)) for source in self.sources]
+        results = []
+        for name, future in futures:
+            try:
+                results.append((name, future.result()))
+            except Exception as e:
+                logger.error(f"Error fetching live data from {name}: {e}")
+        return results
+
+    def build_snapshot(self, results: List[Tuple[str, Dict]]) -> LiveSnapshot:
+        """Merge source payloads (first source wins per match) into a snapshot"""
+        data = {key: (list(value) if isinstance(value, list) else dict(value))
+                for key, value in self.EMPTY.items()}
+        seen = set()
+        for _, payload in results:
+            for match in payload.get('matches', []):
+                if match['name'] not in seen:
+                    seen.add(match['name'])
+                    data['matches'].append(match)
+            for key in ('stats', 'weather', 'pitch_report'):
+                for name, value in payload.get(key, {}).items():
+                    data[key].setdefault(name, value)
+
+        versions = {key: content_hash(value) for key, value in data.items()}
+        version = content_hash(versions)
+        # Matches without fields that tick on their own, for data derived from them
+        versions['match_state'] = content_hash(
+            [{key: value for key, value in match.items() if key not in self.VOLATILE_MATCH_FIELDS}
+             for match in data['matches']])
+        return LiveSnapshot(version, time.time(), data, tuple(name for name, _ in results), versions)
+
+
+def content_hash(value) -> str:
+    """Short stable hash of a JSON-serialisable value"""
+    body = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha1(body).hexdigest()[:16]
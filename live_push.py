@@ -0,0 +1,430 @@
+"""Live score push over Server-Sent Events.
+
+`Broadcaster` turns each new live-data snapshot into SSE messages once: a
+full `snapshot` event (sent to new subscribers) and a `delta` event with
+only the matches and dashboard sections that changed (sent to everyone
+already connected). The same bytes object goes to every subscriber, and a
+subscriber whose bounded queue fills up is dropped rather than slowing the
+others down; the browser's EventSource reconnects and gets a fresh snapshot.
+
+Two ways to serve it:
+
+* `/api/live/subscribe` on the Flask app holds a worker thread per client,
+  which is fine for a few hundred browsers.
+* `PushServer` serves the same stream from one asyncio thread, where an
+  idle subscriber costs a socket and a small protocol object, so one
+  process holds tens of thousands. Start it with LIVE_PUSH_PORT, or try it
+  standalone with demo data:
+
+    python live_push.py demo --port 5001 --interval 1
+"""
+import argparse
+import asyncio
+import json
+import logging
+import queue
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT = b': keepalive\n\n'
+RETRY = b'retry: 3000\n\n'
+
+# Dashboard sections other than matches (which get per-match deltas), by the snapshot keys they cover
+SECTIONS = {
+    'stats': ('stats',),
+    'analysis': ('weather', 'pitch_report')
+}
+
+
+def snapshot_sections(data: Dict) -> Dict:
+    """Dashboard payloads for one snapshot's data (same shape as /api/dashboard)"""
+    return {
+        'stats': data['stats'],
+        'analysis': {'weather': data['weather'], 'pitch': data['pitch_report']},
+        'matches': data['matches']
+    }
+
+
+def sse_message(event: str, data: Dict, event_id: str = None) -> bytes:
+    lines = [f"event: {event}"]
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+def match_deltas(previous: List[Dict], current: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """(new or changed matches, names of matches no longer listed)"""
+    before = {match['name']: match for match in previous}
+    changed = [match for match in current if before.get(match['name']) != match]
+    names = {match['name'] for match in current}
+    return changed, [name for name in before if name not in names]
+
+
+def raise_open_file_limit() -> Optional[int]:
+    """Lift the soft open-files limit to the hard limit (each subscriber is a socket).
+
+    Returns the new limit, or None where there are no rlimits (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        return hard
+    return soft
+
+
+class Subscription:
+    """Bounded queue of encoded messages for one thread-per-client subscriber"""
+
+    __slots__ = ('queue', 'dropped')
+
+    def __init__(self, size: int):
+        self.queue = queue.Queue(maxsize=size)
+        self.dropped = False
+
+    def get(self, timeout: float) -> Optional[bytes]:
+        """Next message, HEARTBEAT after `timeout` idle seconds, None once dropped"""
+        if self.dropped:
+            return None
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None if self.dropped else HEARTBEAT
+
+
+class Broadcaster:
+    """In-process pub/sub for live data: encode once, fan the same bytes out.
+
+    Thread subscribers get a `Subscription` with a queue of `queue_size`
+    messages. Event-loop servers register a listener instead and do their
+    own fan-out on their loop (see PushServer).
+    """
+
+    def __init__(self, queue_size: int = 32, heartbeat: float = 15.0):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.version = None
+        self.snapshot_message = b''
+        self._matches = []
+        self._section_hashes = {}
+        self._subscriptions = set()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def initial_message(self, last_event_id: str = None) -> bytes:
+        """Full snapshot for a new subscriber (nothing if it's already up to date)"""
+        return b'' if last_event_id and last_event_id == self.version else self.snapshot_message
+
+    def subscribe(self, last_event_id: str = None, limit: int = None) -> Optional[Subscription]:
+        """New thread subscriber, or None if `limit` subscribers are already connected"""
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            if limit is not None and len(self._subscriptions) >= limit:
+                return None
+            message = self.initial_message(last_event_id)
+            if message:
+                subscription.queue.put_nowait(message)
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def add_listener(self, callback: Callable[[bytes], None]):
+        """Call `callback(message)` (on the publishing thread) for every update"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def publish(self, snapshot):
+        """Encode a new snapshot once and deliver its delta to every subscriber.
+
+        The first snapshot has nothing to diff against, so subscribers that
+        connected before it get the full `snapshot` message as their baseline.
+        """
+        if snapshot is None or snapshot.version == self.version:
+            return
+        data = snapshot.data
+        sections = snapshot_sections(data)
+        hashes = {name: '-'.join(snapshot.versions.get(key, '') for key in keys)
+                  for name, keys in SECTIONS.items()}
+        full = sse_message('snapshot', {'version': snapshot.version, 'sections': sections},
+                           snapshot.version)
+
+        with self._lock:
+            message = full
+            if self.version is not None:
+                changed, removed = match_deltas(self._matches, data['matches'])
+                payload = {'version': snapshot.version, 'previous': self.version, 'sent': time.time()}
+                if changed:
+                    payload['matches'] = changed
+                if removed:
+                    payload['removed'] = removed
+                changed_sections = {name: sections[name] for name in SECTIONS
+                                    if hashes[name] != self._section_hashes.get(name)}
+                if changed_sections:
+                    payload['sections'] = changed_sections
+                message = sse_message('delta', payload, snapshot.version)
+
+            self.version = snapshot.version
+            self.snapshot_message = full
+            self._matches = data['matches']
+            self._section_hashes = hashes
+            self.published += 1
+
+            for subscription in list(self._subscriptions):
+                try:
+                    subscription.queue.put_nowait(message)
+                    self.delivered += 1
+                except queue.Full:
+                    # Slow consumer: drop it instead of buffering without bound
+                    subscription.dropped = True
+                    self._subscriptions.discard(subscription)
+                    self.dropped += 1
+            listeners = list(self._listeners)
+
+        for callback in listeners:
+            callback(message)
+
+    def start(self, live_data):
+        """Publish every snapshot the LiveDataRefresher produces (background thread)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(live_data,), name='live-push',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, live_data):
+        snapshot = None
+        while not self._stop.is_set():
+            try:
+                if snapshot is None:
+                    snapshot = live_data.get()
+                else:
+                    snapshot = live_data.wait_for_update(snapshot.fetched_at, self.heartbeat) or snapshot
+                self.publish(snapshot)
+            except Exception as e:
+                logger.error(f"Live push publish failed: {e!r}")
+                self._stop.wait(1.0)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'version': self.version, 'subscribers': len(self._subscriptions),
+                    'published': self.published, 'delivered': self.delivered,
+                    'dropped_slow': self.dropped, 'queue_size': self.queue_size}
+
+
+class _SubscriberProtocol(asyncio.Protocol):
+    """One SSE connection: parse the GET, then only ever write"""
+
+    __slots__ = ('server', 'transport', 'request')
+
+    def __init__(self, server: 'PushServer'):
+        self.server = server
+        self.transport = None
+        self.request = b''
+
+    def connection_made(self, transport):
+        self.transport = transport
+        # pause_writing fires once this much is queued: the client isn't keeping up
+        transport.set_write_buffer_limits(high=self.server.max_buffer)
+
+    def data_received(self, data: bytes):
+        if self.request is None:
+            return  # already streaming; ignore anything the client sends
+        self.request += data
+        if b'\r\n\r\n' not in self.request:
+            if len(self.request) > 8192:
+                self.transport.abort()
+            return
+        head, self.request = self.request.split(b'\r\n\r\n', 1)[0], None
+        self.server.handle(self, head.decode('latin-1'))
+
+    def pause_writing(self):
+        self.server.drop(self)
+
+    def connection_lost(self, exc):
+        self.server.clients.discard(self)
+
+
+class PushServer:
+    """Serves the broadcaster's SSE stream to many idle clients from one asyncio thread.
+
+    A delta crosses from the publishing thread to the loop once; the loop
+    then writes the same bytes to every transport. Each client's transport
+    buffer is its bounded queue: past `max_buffer` unsent bytes the client
+    is disconnected.
+
+    With `reuse_port` (SO_REUSEPORT, where available) several processes,
+    such as gunicorn workers, can each run one on the same port, and the
+    kernel spreads new connections across them.
+    """
+
+    def __init__(self, broadcaster: Broadcaster, host: str = '0.0.0.0', port: int = 5001,
+                 path: str = '/api/live/subscribe', max_buffer: int = 64 * 1024,
+                 allow_origin: str = '*', reuse_port: bool = False):
+        self.broadcaster = broadcaster
+        self.host = host
+        self.port = port
+        self.path = path
+        self.max_buffer = max_buffer
+        self.allow_origin = allow_origin
+        self.reuse_port = reuse_port and hasattr(socket, 'SO_REUSEPORT')
+        self.clients = set()
+        self.loop = None
+        self.error = None
+        self._ready = threading.Event()
+        self._thread = None
+        self.connections = 0
+        self.dropped = 0
+        self.fanouts = 0
+
+    def start(self):
+        """Run the server on its own event loop thread; returns once it's listening.
+
+        Raises the bind error (e.g. the port is in use) as soon as it happens.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self.error = None
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name='live-push-server', daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+        if self.error:
+            raise self.error
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self.serve())
+        except OSError as e:
+            self.error = e
+            self.loop.close()
+            self._ready.set()
+            return
+        self.loop.run_forever()
+
+    async def serve(self):
+        limit = raise_open_file_limit()
+        self.loop = asyncio.get_running_loop()
+        await self.loop.create_server(lambda: _SubscriberProtocol(self), self.host, self.port,
+                                      backlog=4096, reuse_address=True,
+                                      reuse_port=self.reuse_port or None)
+        self.broadcaster.add_listener(
+            lambda message: self.loop.call_soon_threadsafe(self.fanout, message))
+        self.loop.call_later(self.broadcaster.heartbeat, self._heartbeat)
+        logger.info(f"Live push on {self.host}:{self.port}{self.path} (open files limit {limit})")
+        self._ready.set()
+
+    def handle(self, client: _SubscriberProtocol, head: str):
+        lines = head.split('\r\n')
+        parts = lines[0].split(' ')
+        if len(parts) < 2 or parts[0] != 'GET':
+            return self._reply(client, '405 Method Not Allowed', 'text/plain', b'GET only\n')
+        path = parts[1].split('?', 1)[0]
+        if path == '/health':
+            body = json.dumps(self.stats()).encode()
+            return self._reply(client, '200 OK', 'application/json', body)
+        if path != self.path:
+            return self._reply(client, '404 Not Found', 'text/plain', b'Not found\n')
+
+        last_event_id = None
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            if name.strip().lower() == 'last-event-id':
+                last_event_id = value.strip()
+        client.transport.write(
+            ('HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n'
+             f'Connection: keep-alive\r\nAccess-Control-Allow-Origin: {self.allow_origin}\r\n'
+             'X-Accel-Buffering: no\r\n\r\n').encode() + RETRY +
+            self.broadcaster.initial_message(last_event_id))
+        self.clients.add(client)
+        self.connections += 1
+
+    def _reply(self, client: _SubscriberProtocol, status: str, content_type: str, body: bytes):
+        client.transport.write(
+            f'HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n'
+            f'Access-Control-Allow-Origin: {self.allow_origin}\r\nConnection: close\r\n\r\n'.encode() + body)
+        client.transport.close()
+
+    def fanout(self, message: bytes):
+        """Write one message to every client (runs on the loop)"""
+        self.fanouts += 1
+        for client in list(self.clients):
+            client.transport.write(message)
+
+    def drop(self, client: _SubscriberProtocol):
+        if client in self.clients:
+            self.clients.discard(client)
+            self.dropped += 1
+        client.transport.abort()
+
+    def _heartbeat(self):
+        self.fanout(HEARTBEAT)
+        self.loop.call_later(self.broadcaster.heartbeat, self._heartbeat)
+
+    def stats(self) -> Dict:
+        return {'port': self.port, 'listening': self._ready.is_set() and not self.error,
+                'error': str(self.error) if self.error else None, 'clients': len(self.clients),
+                'connections': self.connections, 'dropped_slow': self.dropped, 'fanouts': self.fanouts}
+
+
+def demo(host: str, port: int, interval: float):
+    """Standalone push server over demo data where the live score moves every refresh"""
+    from live_feed import DemoStatsFeed, FakeLiveFeed, LiveDataRefresher
+
+    class TickingFeed(FakeLiveFeed):
+        def fetch(self) -> Dict:
+            payload = super().fetch()
+            balls = self.calls % 120
+            payload['matches'][0]['score'] = (f"MI: {balls * 4 // 3}/{balls // 30} "
+                                              f"({balls // 6}.{balls % 6}) vs CSK: 145/6 (20)")
+            return payload
+
+    live_data = LiveDataRefresher([TickingFeed(), DemoStatsFeed()], interval=interval)
+    live_data.start()
+    broadcaster = Broadcaster()
+    broadcaster.start(live_data)
+    server = PushServer(broadcaster, host=host, port=port)
+    server.start()
+    print(f"Pushing demo live scores on http://{host}:{port}{server.path} every {interval}s")
+    try:
+        while True:
+            time.sleep(5)
+            print(json.dumps(server.stats()))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Live score push tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    demo_parser = commands.add_parser('demo', help='push server over ticking demo data')
+    demo_parser.add_argument('--host', default='127.0.0.1')
+    demo_parser.add_argument('--port', type=int, default=5001)
+    demo_parser.add_argument('--interval', type=float, default=1.0, help='seconds between updates')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    demo(args.host, args.port, args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+import sys
+import threading
+import time
+import uuid
+from collections import Counter as _Counter, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+class Histogram:
+    """HDR-style log-linear histogram of durations.
+
+    Values are recorded in microseconds into buckets that are linear within
+    each power of two (2**SUB_BITS buckets per doubling), so every recorded
+    value is kept to within ~3% relative error using a few hundred sparse
+    buckets, whatever the range. Recording is O(1).
+    """
+
+    SUB_BITS = 5
+    SUB_COUNT = 1 << SUB_BITS
+    HALF = SUB_COUNT >> 1
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    @classmethod
+    def _index(cls, micros: int) -> int:
+        if micros < cls.SUB_COUNT:
+            return micros
+        shift = micros.bit_length() - cls.SUB_BITS
+        return cls.SUB_COUNT + (shift - 1) * cls.HALF + ((micros >> shift) - cls.HALF)
+
+    @classmethod
+    def _upper_bound(cls, index: int) -> int:
+        """Highest microsecond value that lands in a bucket"""
+        if index < cls.SUB_COUNT:
+            return index
+        shift, offset = divmod(index - cls.SUB_COUNT, cls.HALF)
+        shift += 1
+        return ((cls.HALF + offset + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        micros = max(0, int(seconds * 1e6))
+        index = self._index(micros)
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Value (seconds) at quantile q in [0, 1]"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = max(1, int(round(q * self.count)))
+            seen = 0
+            for index in sorted(self._counts):
+                seen += self._counts[index]
+                if seen >= target:
+                    return min(self._upper_bound(index) / 1e6, self.max)
+            return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'p50_ms': round(self.percentile(0.5) * 1000, 2),
+            'p95_ms': round(self.percentile(0.95) * 1000, 2),
+            'p99_ms': round(self.percentile(0.99) * 1000, 2),
+            'max_ms': round(self.max * 1000, 2)
+        }
+
+
+class MetricsRegistry:
+    """Counters, gauges and histograms keyed by name + labels, rendered for Prometheus"""
+
+    QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+    def __init__(self, prefix: str = 'cricket_ai'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._help = {}
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict) -> Tuple:
+        return name, tuple(sorted(labels.items()))
+
+    def describe(self, name: str, text: str):
+        self._help[name] = text
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        key = self._key(name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, name: str, seconds: float, **labels):
+        self.histogram(name, **labels).record(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def counter_value(self, name: str, **labels) -> float:
+        return self._counters.get(self._key(name, labels), 0)
+
+    @staticmethod
+    def _labels(labels: Tuple, extra: Dict = None) -> str:
+        pairs = list(labels) + list((extra or {}).items())
+        if not pairs:
+            return ''
+        body = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+                        for k, v in pairs)
+        return '{' + body + '}'
+
+    def render(self) -> str:
+        """Prometheus text exposition format (histograms are exported as summaries)"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+
+        def header(name: str, kind: str, seen: set):
+            if name in seen:
+                return
+            seen.add(name)
+            full = f"{self.prefix}_{name}"
+            if name in self._help:
+                lines.append(f"# HELP {full} {self._help[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+
+        seen = set()
+        for (name, labels), value in counters:
+            header(name, 'counter', seen)
+            lines.append(f"{self.prefix}_{name}{self._labels(labels)} {value}")
+        for (name, labels), value in gauges:
+            header(name, 'gauge', seen)
+            lines.append(f"{self.prefix}_{name}{self._labels(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            header(name, 'summary', seen)
+            full = f"{self.prefix}_{name}"
+            for q in self.QUANTILES:
+                lines.append(f"{full}{self._labels(labels, {'quantile': q})} {histogram.percentile(q):.6f}")
+            lines.append(f"{full}_sum{self._labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{full}_count{self._labels(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack at a fixed interval while active.
+
+    Produces collapsed stacks ("a;b;c count"), the input format of
+    flamegraph.pl and speedscope. Only the profiled request's thread pays
+    for it, and nothing runs unless a profile is explicitly requested.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = _Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self.collapsed()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return '\n'.join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+
+class ProfileStore:
+    """Keeps the most recent request profiles for download"""
+
+    def __init__(self, max_profiles: int = 20):
+        self._profiles = deque(maxlen=max_profiles)
+
+    def add(self, route: str, duration: float, collapsed: str) -> str:
+        profile_id = uuid.uuid4().hex[:12]
+        self._profiles.append({'id': profile_id, 'route': route,
+                               'duration_ms': round(duration * 1000, 2), 'stacks': collapsed})
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        return next((p for p in self._profiles if p['id'] == profile_id), None)
+
+    def list(self) -> List[Dict]:
+        return [{k: v for k, v in p.items() if k != 'stacks'} for p in self._profiles]
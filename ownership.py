@@ -0,0 +1,204 @@
+"""Streaming fantasy ownership from the teams users submit.
+
+Every submitted XI adds one to the count of each of its players, of its
+captain and of its captain/vice-captain pair. Counts are kept in
+count-min sketches (fixed-size arrays, so memory doesn't grow with the
+number of teams or distinct pairs) with Space-Saving heavy-hitter lists
+for the most owned players and the most popular C/VC pairs.
+
+Counts decay exponentially with `half_life`, using forward decay: a team
+submitted at time t is added with weight 2^((t - landmark) / half_life)
+and every estimate is divided by the current weight, so nothing is ever
+swept; when the weights grow large everything is rescaled once. Ownership
+is a ratio of two counts that decay alike, so it only moves when new
+teams arrive.
+"""
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+
+# Rescale once the forward-decay weight reaches this (keeps float64 exact enough)
+RESCALE_AT = 2.0 ** 40
+
+
+class CountMinSketch:
+    """`depth` rows of `width` counters; estimates never undercount"""
+
+    def __init__(self, width: int = 4096, depth: int = 4, max_cached_keys: int = 65536):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width))
+        self._rows = np.arange(depth)
+        self._indexes = {}
+        self.max_cached_keys = max_cached_keys
+
+    def indexes(self, key: str) -> np.ndarray:
+        """Column of `key` in each row (from one blake2b digest, cached)"""
+        cached = self._indexes.get(key)
+        if cached is None:
+            digest = hashlib.blake2b(key.encode(), digest_size=4 * self.depth).digest()
+            cached = np.frombuffer(digest, dtype='<u4') % self.width
+            if len(self._indexes) >= self.max_cached_keys:
+                self._indexes.clear()
+            self._indexes[key] = cached
+        return cached
+
+    def add(self, keys: Iterable[str], weight: float):
+        """Add `weight` to every key (a key listed twice is counted twice)"""
+        columns = np.array([self.indexes(key) for key in keys])
+        if len(columns):
+            np.add.at(self.table, (np.broadcast_to(self._rows, columns.shape), columns), weight)
+
+    def estimates(self, keys: List[str]) -> np.ndarray:
+        if not keys:
+            return np.zeros(0)
+        columns = np.array([self.indexes(key) for key in keys])
+        return self.table[self._rows, columns].min(axis=1)
+
+    def scale(self, factor: float):
+        self.table *= factor
+
+
+class SpaceSaving:
+    """Top-k heavy hitters (Metwally et al.): `capacity` counters, error bounded by the smallest"""
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts = {}  # key -> [count, overestimate]
+
+    def add(self, key: str, weight: float):
+        entry = self.counts.get(key)
+        if entry is not None:
+            entry[0] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = [weight, 0.0]
+        else:
+            # Replace the smallest counter; the newcomer inherits its count as error
+            smallest = min(self.counts, key=lambda k: self.counts[k][0])
+            floor = self.counts.pop(smallest)[0]
+            self.counts[key] = [floor + weight, floor]
+
+    def top(self, count: int) -> List[Tuple[str, float, float]]:
+        """[(key, count, overestimate)], largest first"""
+        ranked = sorted(self.counts.items(), key=lambda item: -item[1][0])[:count]
+        return [(key, value, error) for key, (value, error) in ranked]
+
+    def scale(self, factor: float):
+        for entry in self.counts.values():
+            entry[0] *= factor
+            entry[1] *= factor
+
+
+class Team(NamedTuple):
+    players: Tuple[str, ...]
+    captain: str
+    vice_captain: str
+
+
+class OwnershipTracker:
+    """Decayed ownership of players, captains and C/VC pairs from submitted XIs"""
+
+    def __init__(self, half_life: float = 6 * 3600, width: int = 4096, depth: int = 4,
+                 top_k: int = 100, clock: Callable[[], float] = time.time):
+        self.half_life = half_life
+        self.clock = clock
+        self.players = CountMinSketch(width, depth)
+        self.captains = CountMinSketch(width, depth)
+        self.pairs = CountMinSketch(width, depth)
+        self.top_owned = SpaceSaving(top_k)
+        self.top_pairs = SpaceSaving(top_k)
+        self.landmark = clock()
+        self.total = 0.0  # decayed number of teams (same scale as the sketches)
+        self.teams = 0    # teams ever submitted
+        self._lock = threading.Lock()
+        self._version = (0, 0.0, 0)  # (number, published at, teams at publish)
+
+    def _weight(self, at: float) -> float:
+        return 2.0 ** ((at - self.landmark) / self.half_life)
+
+    def _rescale(self, now: float):
+        weight = self._weight(now)
+        if weight < RESCALE_AT:
+            return
+        factor = 1.0 / weight
+        for structure in (self.players, self.captains, self.pairs, self.top_owned, self.top_pairs):
+            structure.scale(factor)
+        self.total *= factor
+        self.landmark = now
+
+    def add_teams(self, teams: Iterable[Team], at: float = None):
+        """Count a batch of submitted teams (one vectorized update per sketch)"""
+        now = self.clock() if at is None else at
+        teams = list(teams)
+        if not teams:
+            return
+        with self._lock:
+            self._rescale(now)
+            weight = self._weight(now)
+            self.players.add([key for team in teams for key in team.players], weight)
+            self.captains.add([team.captain for team in teams], weight)
+            pair_keys = [f"{team.captain}|{team.vice_captain}" for team in teams]
+            self.pairs.add(pair_keys, weight)
+            for team, pair in zip(teams, pair_keys):
+                for key in team.players:
+                    self.top_owned.add(key, weight)
+                self.top_pairs.add(pair, weight)
+            self.total += weight * len(teams)
+            self.teams += len(teams)
+
+    def add_team(self, team: Team, at: float = None):
+        self.add_teams([team], at)
+
+    def sample_size(self) -> float:
+        """Decayed number of teams the current ownership is based on"""
+        with self._lock:
+            return self.total / self._weight(self.clock()) if self.total else 0.0
+
+    def ownership(self, keys: List[str]) -> np.ndarray:
+        """Share of (decayed) teams that include each player, 0-1"""
+        with self._lock:
+            if not self.total:
+                return np.zeros(len(keys))
+            return np.minimum(self.players.estimates(keys) / self.total, 1.0)
+
+    def captaincy(self, keys: List[str]) -> np.ndarray:
+        """Share of teams that captain each player, 0-1"""
+        with self._lock:
+            if not self.total:
+                return np.zeros(len(keys))
+            return np.minimum(self.captains.estimates(keys) / self.total, 1.0)
+
+    def most_owned(self, count: int = 10) -> List[Dict]:
+        with self._lock:
+            total = self.total or 1.0
+            return [{'player': key, 'ownership': round(value / total, 4),
+                     'max_error': round(error / total, 4)}
+                    for key, value, error in self.top_owned.top(count)]
+
+    def popular_pairs(self, count: int = 10) -> List[Dict]:
+        with self._lock:
+            total = self.total or 1.0
+            return [{'captain': key.split('|')[0], 'vice_captain': key.split('|')[1],
+                     'share': round(value / total, 4), 'max_error': round(error / total, 4)}
+                    for key, value, error in self.top_pairs.top(count)]
+
+    def version(self, min_interval: float = 60.0) -> int:
+        """Counter that moves when new teams arrived, at most every `min_interval` seconds"""
+        now = self.clock()
+        with self._lock:
+            number, published_at, teams = self._version
+            if self.teams != teams and now - published_at >= min_interval:
+                self._version = (number + 1, now, self.teams)
+            return self._version[0]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            sketch_bytes = sum(s.table.nbytes for s in (self.players, self.captains, self.pairs))
+            return {'teams': self.teams,
+                    'effective_teams': round(self.total / self._weight(self.clock()), 1) if self.total else 0.0,
+                    'half_life_seconds': self.half_life,
+                    'sketch_bytes': sketch_bytes,
+                    'heavy_hitters': len(self.top_owned.counts) + len(self.top_pairs.counts)}
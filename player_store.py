@@ -0,0 +1,128 @@
+import numpy as np
+from typing import Dict, List
+
+
+class PlayerStore:
+    """Columnar, NumPy-backed view of the player database.
+
+    Each numeric attribute lives in its own float array (NaN where a player
+    doesn't have that attribute) and the recent scores/wickets windows are
+    fixed-width 2D arrays, so form scoring for a whole roster is a handful of
+    vectorized operations instead of a Python loop per player.
+    """
+
+    NUMERIC_FIELDS = (
+        'price', 'form', 'avg_points', 'vs_pace', 'vs_spin', 'powerplay',
+        'death_overs', 'home_advantage', 'powerplay_eff', 'death_eff',
+        'economy', 'vs_top_order', 'vs_lower_order', 'batting_avg', 'bowling_avg'
+    )
+    WINDOW = 5
+
+    def __init__(self, player_db: Dict):
+        self.ids = []
+        self.names = []
+        self.teams = []
+        self.roles = []
+        records = []
+
+        for players in player_db.values():
+            for key, player in players.items():
+                self.ids.append(key)
+                self.names.append(player['name'])
+                self.teams.append(player['team'])
+                self.roles.append(player['role'])
+                records.append(player)
+
+        self.row_of = {key: row for row, key in enumerate(self.ids)}
+        self.size = len(records)
+
+        self.columns = {
+            field: np.array([p.get(field, np.nan) for p in records], dtype=np.float64)
+            for field in self.NUMERIC_FIELDS
+        }
+        self.recent_scores = self._window(records, 'recent_scores')
+        self.recent_wickets = self._window(records, 'recent_wickets')
+        # Derived per-row values score_form needs, kept up to date by update_player
+        self.recent_avg, self.has_recent = self.window_average(self.recent_scores)
+        self.strong_home = self.columns['home_advantage'] > 85
+
+    def _window(self, records: List[Dict], field: str) -> np.ndarray:
+        """Pack the last WINDOW values of a list field into an (n, WINDOW) array"""
+        window = np.full((len(records), self.WINDOW), np.nan)
+        for row, player in enumerate(records):
+            values = player.get(field, [])[-self.WINDOW:]
+            if values:
+                window[row, :len(values)] = values
+        return window
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, field: str) -> np.ndarray:
+        """Return the array backing a numeric attribute"""
+        return self.columns[field]
+
+    def update_player(self, key: str, player: Dict):
+        """Refresh one player's row in place after their record changed"""
+        row = self.row_of[key]
+        for field in self.NUMERIC_FIELDS:
+            self.columns[field][row] = player.get(field, np.nan)
+        for field, window in (('recent_scores', self.recent_scores),
+                              ('recent_wickets', self.recent_wickets)):
+            values = player.get(field, [])[-self.WINDOW:]
+            window[row] = np.nan
+            if values:
+                window[row, :len(values)] = values
+        averages, has_data = self.window_average(self.recent_scores[row:row + 1])
+        self.recent_avg[row], self.has_recent[row] = averages[0], has_data[0]
+        self.strong_home[row] = self.columns['home_advantage'][row] > 85
+
+    @staticmethod
+    def window_average(window: np.ndarray) -> tuple:
+        """Row-wise mean ignoring padding, plus a mask of rows that have data"""
+        counts = np.count_nonzero(~np.isnan(window), axis=1)
+        has_data = counts > 0
+        averages = np.nansum(window, axis=1) / np.maximum(counts, 1)
+        return averages, has_data
+
+    def score_form(self, rows: np.ndarray, match_context: Dict,
+                   adjustments: np.ndarray = None) -> Dict:
+        """Vectorized form scoring for the given rows.
+
+        Mirrors CricketAI.analyze_player_form and returns the raw arrays
+        (scores, per-rule masks and recent averages) needed to build the
+        reasoning text for each player. `adjustments` are extra per-row
+        points (e.g. venue/head-to-head history) added before clipping.
+        """
+        scores = self.columns['form'][rows].copy()
+        if adjustments is not None:
+            scores += adjustments
+
+        home = np.zeros(len(rows), dtype=bool)
+        if 'venue' in match_context and 'home' in match_context.get('venue', '').lower():
+            home = self.strong_home[rows]
+            scores += np.where(home, 10, 0)
+
+        opposition = None
+        if 'opposition' in match_context:
+            opp_strength = match_context.get('opposition_bowling_strength', 75)
+            if opp_strength < 70:
+                scores += 8
+                opposition = "Weak opposition bowling"
+            elif opp_strength > 85:
+                scores -= 5
+                opposition = "Strong opposition bowling"
+
+        recent_avg, has_recent = self.recent_avg[rows], self.has_recent[rows]
+        excellent = has_recent & (recent_avg > 50)
+        poor = has_recent & (recent_avg < 25)
+        scores += np.where(excellent, 5, 0) - np.where(poor, 8, 0)
+
+        return {
+            'scores': np.clip(scores, 0, 100),
+            'home': home,
+            'opposition': opposition,
+            'recent_avg': recent_avg,
+            'excellent': excellent,
+            'poor': poor
+        }
@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, NamedTuple, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English and numbers)"""
+    return (len(text) + 3) // 4
+
+
+class Fragment(NamedTuple):
+    text: str
+    tokens: int
+
+
+def text_fragment(text: str) -> Fragment:
+    """Uncached fragment for per-request text (e.g. conversation history)"""
+    return Fragment(text, estimate_tokens(text) + 1)  # +1 for the newline
+
+
+class Prompt(NamedTuple):
+    text: str
+    tokens: int
+    fragments: int
+    truncated: int  # sections cut short by the budget
+
+
+class PromptBuilder:
+    """Assembles LLM prompts from cached context fragments under a token budget.
+
+    Fragments (one player's stat line, one match, the conditions report)
+    are rendered once per version of their source data and kept in an LRU.
+    `assemble` adds sections in priority order and stops adding fragments
+    once the budget is used up, so the prompt only grows with what the
+    question is about, never with the size of the roster.
+    """
+
+    def __init__(self, budget: int = 600, max_fragments: int = 2048):
+        self.budget = budget
+        self.max_fragments = max_fragments
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fragment(self, key: Tuple, render: Callable[[], str]) -> Fragment:
+        """Cached rendering of `render()`; `key` must include the source data version"""
+        with self._lock:
+            cached = self._fragments.get(key)
+            if cached is not None:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        fragment = text_fragment(render())
+        with self._lock:
+            self._fragments[key] = fragment
+            while len(self._fragments) > self.max_fragments:
+                self._fragments.popitem(last=False)
+        return fragment
+
+    def assemble(self, question: str, sections: Iterable[Tuple[str, Iterable[Fragment]]],
+                 budget: int = None) -> Prompt:
+        """Question first, then each section's fragments while they fit in the budget.
+
+        A section stops at its first fragment that doesn't fit (fragments come
+        in priority order), and fragment iterables are consumed lazily, so
+        fragments past the budget are never rendered. Later sections still
+        get whatever budget is left.
+        """
+        budget = self.budget if budget is None else budget
+        lines = [f"Question: {question}"]
+        used = estimate_tokens(lines[0])
+        added = truncated = 0
+
+        for title, fragments in sections:
+            heading = f"\n{title}:"
+            heading_tokens = estimate_tokens(heading)
+            section = []
+            for fragment in fragments:
+                cost = fragment.tokens + (0 if section else heading_tokens)
+                if used + cost > budget:
+                    truncated += 1
+                    break
+                if not section:
+                    section.append(heading)
+                section.append(fragment.text)
+                used += cost
+                added += 1
+            lines.extend(section)
+
+        return Prompt('\n'.join(lines), used, added, truncated)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'budget_tokens': self.budget,
+                'fragments': len(self._fragments),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
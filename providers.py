@@ -0,0 +1,342 @@
+import asyncio
+import importlib.util
+import logging
+import queue
+import random
+import threading
+import time
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderError(Exception):
+    """Raised when an LLM provider fails to produce an answer"""
+
+
+class Provider:
+    """Base class for async LLM providers"""
+
+    name = 'provider'
+    sdk = None  # module the client comes from; imported on first call
+
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        if self.sdk and importlib.util.find_spec(self.sdk) is None:
+            # Fail at startup like an eager import would, without paying for it
+            raise ImportError(f"No module named '{self.sdk}'")
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """SDK client, created (and the SDK imported) on first use"""
+        with self._client_lock:
+            if self._client is None:
+                self._client = self.create_client()
+            return self._client
+
+    def create_client(self):
+        raise NotImplementedError
+
+    async def complete(self, prompt: str, system: str = None) -> str:
+        raise NotImplementedError
+
+    async def stream(self, prompt: str, system: str = None) -> AsyncIterator[str]:
+        """Yield the answer as text chunks (default: one chunk once complete)"""
+        yield await self.complete(prompt, system)
+
+
+class AnthropicProvider(Provider):
+    """Claude via the async Anthropic SDK (one pooled client per process)"""
+
+    name = 'anthropic'
+    sdk = 'anthropic'
+
+    def __init__(self, api_key: str, model: str = "claude-3-sonnet-20240229",
+                 max_tokens: int = 500, timeout: float = 10.0):
+        super().__init__(timeout)
+        self.api_key = api_key
+        self.model = model
+        self.max_tokens = max_tokens
+
+    def create_client(self):
+        from anthropic import AsyncAnthropic
+        # Retries are handled by the router falling through to the next provider
+        return AsyncAnthropic(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+
+    async def complete(self, prompt: str, system: str = None) -> str:
+        kwargs = {'system': system} if system else {}
+        response = await self.client.messages.create(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            **kwargs
+        )
+        return response.content[0].text
+
+    async def stream(self, prompt: str, system: str = None) -> AsyncIterator[str]:
+        kwargs = {'system': system} if system else {}
+        events = await self.client.messages.create(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            **kwargs
+        )
+        async for event in events:
+            if event.type == 'content_block_delta' and getattr(event.delta, 'text', None):
+                yield event.delta.text
+
+
+class OpenAIProvider(Provider):
+    """GPT via the async OpenAI SDK (one pooled client per process)"""
+
+    name = 'openai'
+    sdk = 'openai'
+
+    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo",
+                 max_tokens: int = 500, timeout: float = 10.0):
+        super().__init__(timeout)
+        self.api_key = api_key
+        self.model = model
+        self.max_tokens = max_tokens
+
+    def create_client(self):
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+
+    async def complete(self, prompt: str, system: str = None) -> str:
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens
+        )
+        return response.choices[0].message.content
+
+    async def stream(self, prompt: str, system: str = None) -> AsyncIterator[str]:
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        chunks = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+        async for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class StubProvider(Provider):
+    """Offline provider with injectable latency and failures for local testing"""
+
+    def __init__(self, name: str = 'stub', reply: str = None, latency: float = 0.0,
+                 failure_rate: float = 0.0, timeout: float = 10.0, seed: int = None):
+        super().__init__(timeout)
+        self.name = name
+        self.reply = reply
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    async def complete(self, prompt: str, system: str = None) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self._random.random() < self.failure_rate:
+            raise ProviderError(f"{self.name} injected failure")
+        if self.reply is not None:
+            return self.reply
+        return f"[{self.name}] {prompt.strip()[:200]}"
+
+    async def stream(self, prompt: str, system: str = None) -> AsyncIterator[str]:
+        # Latency applies to the first token; later words trickle out quickly
+        answer = await self.complete(prompt, system)
+        for word in answer.split(' '):
+            yield word + ' '
+            await asyncio.sleep(0.005)
+
+
+class ProviderRouter:
+    """Runs provider calls on a background event loop with deadlines and hedging.
+
+    Providers are tried in order. Each call is bounded by the provider's own
+    timeout and the whole request by `deadline`. A failure starts the next
+    provider immediately; with `hedge_delay` set, the next provider is also
+    started if the current one hasn't answered after that many seconds, and
+    whichever answers first wins. `complete` returns None when every provider
+    failed so the caller can fall back to rule-based answers straight away.
+    """
+
+    def __init__(self, providers: List[Provider], deadline: float = 15.0,
+                 hedge_delay: float = None, metrics=None):
+        self.providers = providers
+        self.deadline = deadline
+        self.hedge_delay = hedge_delay
+        # Optional MetricsRegistry for per-provider latency, errors and fallbacks
+        self.metrics = metrics
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.providers)
+
+    def has(self, name: str) -> bool:
+        return any(p.name == name for p in self.providers)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop shared by all requests so SDK connection pools are reused"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='llm-provider-loop',
+                                 daemon=True).start()
+            return self._loop
+
+    async def _call(self, provider: Provider, prompt: str, system: str) -> str:
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            answer = await asyncio.wait_for(provider.complete(prompt, system), provider.timeout)
+            outcome = 'ok'
+            return answer
+        except asyncio.CancelledError:
+            outcome = 'cancelled'
+            raise
+        finally:
+            self._record(provider.name, outcome, time.perf_counter() - started)
+
+    def _record(self, provider: str, outcome: str, seconds: float):
+        if self.metrics is None:
+            return
+        self.metrics.observe('llm_provider_duration_seconds', seconds, provider=provider, outcome=outcome)
+        if outcome == 'error':
+            self.metrics.inc('llm_provider_errors_total', provider=provider)
+
+    def _count(self, name: str, **labels):
+        if self.metrics is not None:
+            self.metrics.inc(name, **labels)
+
+    async def complete_async(self, prompt: str, system: str = None) -> Optional[Tuple[str, str]]:
+        """Return (provider name, answer) from the first provider to succeed"""
+        waiting = list(self.providers)
+        running = {}
+
+        def start_next():
+            provider = waiting.pop(0)
+            task = asyncio.ensure_future(self._call(provider, prompt, system))
+            running[task] = provider
+
+        try:
+            if waiting:
+                start_next()
+            while running:
+                hedge = self.hedge_delay if waiting and self.hedge_delay is not None else None
+                done, _ = await asyncio.wait(list(running), timeout=hedge,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Hedge timer fired: race the next provider against the slow one
+                    logger.info(f"Hedging {running[next(iter(running))].name} with {waiting[0].name}")
+                    self._count('llm_hedges_total', provider=waiting[0].name)
+                    start_next()
+                    continue
+
+                for task in done:
+                    provider = running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if provider is not self.providers[0]:
+                            self._count('llm_fallbacks_total', provider=provider.name)
+                        return provider.name, task.result()
+                    logger.warning(f"{provider.name} API error: {error!r}")
+
+                if not running and waiting:
+                    start_next()
+            return None
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def stream_async(self, prompt: str, system: str = None) -> AsyncIterator[Tuple[str, str]]:
+        """Yield (provider name, chunk) from the first provider to start answering.
+
+        A provider that fails or times out before its first chunk is skipped;
+        once a provider has started streaming it owns the answer, and an error
+        part-way through raises ProviderError (the chunks so far are partial).
+        """
+        for provider in self.providers:
+            started = time.perf_counter()
+            chunks = provider.stream(prompt, system).__aiter__()
+            try:
+                first = await asyncio.wait_for(chunks.__anext__(), provider.timeout)
+            except StopAsyncIteration:
+                continue
+            except Exception as e:
+                logger.warning(f"{provider.name} API error: {e!r}")
+                self._record(provider.name, 'error', time.perf_counter() - started)
+                await chunks.aclose()
+                continue
+
+            self._record(provider.name, 'first_token', time.perf_counter() - started)
+            if provider is not self.providers[0]:
+                self._count('llm_fallbacks_total', provider=provider.name)
+            yield provider.name, first
+            try:
+                async for chunk in chunks:
+                    yield provider.name, chunk
+            except Exception as e:
+                logger.warning(f"{provider.name} stream interrupted: {e!r}")
+                raise ProviderError(f"{provider.name} stream interrupted") from e
+            return
+
+    def stream(self, prompt: str, system: str = None) -> Iterator[Tuple[str, str]]:
+        """Blocking iterator over stream_async for request threads.
+
+        Raises ProviderError after the last chunk if the stream was cut short
+        (provider error or the overall deadline), so callers never mistake a
+        partial answer for a complete one.
+        """
+        if not self.providers:
+            return
+        chunks = queue.Queue()
+        done = object()
+        completed = threading.Event()
+
+        async def pump():
+            try:
+                async for item in self.stream_async(prompt, system):
+                    chunks.put(item)
+                completed.set()
+            finally:
+                chunks.put(done)
+
+        future = asyncio.run_coroutine_threadsafe(
+            asyncio.wait_for(pump(), self.deadline), self.loop)
+        try:
+            while True:
+                item = chunks.get()
+                if item is done:
+                    break
+                yield item
+            if not completed.is_set():
+                raise ProviderError('Stream ended before the answer was complete')
+        finally:
+            # Client went away or we finished: stop the provider stream either way
+            future.cancel()
+
+    def complete(self, prompt: str, system: str = None) -> Optional[Tuple[str, str]]:
+        """Blocking wrapper for request threads, bounded by the overall deadline"""
+        if not self.providers:
+            return None
+        future = asyncio.run_coroutine_threadsafe(
+            asyncio.wait_for(self.complete_async(prompt, system), self.deadline), self.loop)
+        try:
+            return future.result()
+        except Exception as e:
+            future.cancel()
+            logger.warning(f"LLM providers gave no answer: {e!r}")
+            return None
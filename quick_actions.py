@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import json
+import threading
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+
+class Payload(NamedTuple):
+    """A response body serialized and compressed once, ready to send as-is"""
+    body: bytes
+    gzip: bytes
+    br: Optional[bytes]
+    etag: str
+    status: int = 200
+
+    def encoded(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """Pick the smallest encoding the client accepts: (bytes, Content-Encoding)"""
+        accepted = {token.split(';')[0].strip() for token in accept_encoding.lower().split(',')}
+        if self.br is not None and 'br' in accepted:
+            return self.br, 'br'
+        if 'gzip' in accepted:
+            return self.gzip, 'gzip'
+        return self.body, None
+
+
+def encode_payload(data, status: int = 200) -> Payload:
+    """Serialize to JSON once and keep identity, gzip and (if available) brotli bodies"""
+    body = json.dumps(data, separators=(',', ':')).encode()
+    return Payload(
+        body=body,
+        gzip=gzip.compress(body, compresslevel=6, mtime=0),
+        br=brotli.compress(body) if brotli else None,
+        etag='"%s"' % hashlib.sha1(body).hexdigest()[:16],
+        status=status
+    )
+
+
+class QuickActionCache:
+    """Pre-serialized quick-action payloads for one version of the underlying data.
+
+    Payloads only depend on the player database and the match context, so
+    each one is built the first time it is asked for at a version (the caller
+    passes its current version) and every click in between just sends stored
+    bytes. A version change only drops the stored payloads; actions nobody
+    asks for are never rebuilt. Builds hold a per-action lock, so concurrent
+    callers of one action wait for a single build while other actions are
+    served (or built) independently.
+    """
+
+    def __init__(self, builders: Dict[str, Callable[[], Tuple[Dict, int]]]):
+        self.builders = builders
+        self._state = (None, {})  # (version, payloads), swapped as one reference
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self.builds = 0
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._state[0]
+
+    def get(self, key: str, version: str,
+            build: Callable[[], Tuple[Dict, int]] = None) -> Payload:
+        """Payload for `key` at `version`; `build` makes variants not in `builders`"""
+        current, payloads = self._state
+        if current == version and key in payloads:
+            return payloads[key]
+
+        with self._lock:
+            if self._state[0] != version:
+                self._state = (version, {})
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            current, payloads = self._state
+            if current == version and key in payloads:
+                return payloads[key]
+            data, status = (build or self.builders[key])()
+            payload = encode_payload(data, status)
+            with self._lock:
+                self.builds += 1
+                if self._state[0] == version:
+                    self._state[1][key] = payload
+            return payload
+
+    def stats(self) -> Dict:
+        version, payloads = self._state
+        return {'version': version, 'payloads': len(payloads), 'builds': self.builds,
+                'brotli': brotli is not None}
@@ -0,0 +1,65 @@
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from cache_backends import CacheBackend, LocalLRUCache
+
+
+class ResponseCache:
+    """AI answer cache with TTL, hit/miss counters and coalesced misses.
+
+    Storage and eviction are delegated to a CacheBackend (in-process LRU by
+    default, or a backend shared by every worker). Keys are built by the
+    caller (CricketAI.response_cache_key) from the normalized query and the
+    live-data version.
+    """
+
+    def __init__(self, backend: CacheBackend = None, ttl: float = 300):
+        self.backend = backend or LocalLRUCache()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached answer or None"""
+        value = self.backend.get(key)
+        self._count(value is not None)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        self.backend.set(key, value, self.ttl if ttl is None else ttl)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: float = None) -> Any:
+        """Return the cached answer, or compute it once even if many callers miss together"""
+        computed = []
+
+        def counted_compute():
+            computed.append(True)
+            return compute()
+
+        value = self.backend.get_or_compute(key, counted_compute, self.ttl if ttl is None else ttl)
+        self._count(not computed)
+        return value
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict:
+        """Counters for the health endpoint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+        stats.update(self.backend.stats())
+        return stats
@@ -0,0 +1,206 @@
+"""Server-side conversation sessions with bounded memory.
+
+Each session keeps the last few turns verbatim and folds older ones into a
+short extractive summary (one line per earlier question), so follow-ups
+like "what about him as captain?" can be answered in context. Sessions
+live in an LRU with idle expiry, each capped at `max_bytes` of text, so
+the store never holds more than about `max_sessions * max_bytes` bytes of
+conversation no matter how many fans are chatting.
+"""
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Dict, List, NamedTuple, Optional
+
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+# Pronouns a follow-up uses for the player of the previous turn. Singular
+# only: 'they'/'them'/'their' as often mean a team, the fans or the pitch
+PRONOUN_PATTERN = re.compile(r"\b(he|him|his|she|her)\b", re.IGNORECASE)
+
+
+class Turn(NamedTuple):
+    role: str   # 'user' or 'assistant'
+    text: str
+    size: int   # UTF-8 bytes
+
+
+class Session:
+    """Recent turns, summary of older ones and the players last talked about"""
+
+    __slots__ = ('id', 'turns', 'summary', 'players', 'size', 'last_seen')
+
+    def __init__(self, session_id: str, summary_lines: int):
+        self.id = session_id
+        self.turns = deque()
+        self.summary = deque(maxlen=summary_lines)
+        self.players = []  # names mentioned in the previous question, for pronoun resolution
+        self.size = 0
+        self.last_seen = time.monotonic()
+
+    def history(self, max_chars: int) -> List[str]:
+        """Summary and the newest turns that fit in `max_chars`, oldest first"""
+        lines = []
+        used = 0
+        for turn in reversed(self.turns):
+            line = f"{'Fan' if turn.role == 'user' else 'You'}: {turn.text}"
+            if used + len(line) > max_chars:
+                break
+            lines.append(line)
+            used += len(line)
+        if self.summary:
+            line = 'Earlier questions: ' + '; '.join(self.summary)
+            if used + len(line) <= max_chars:
+                lines.append(line)
+        return lines[::-1]
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+def valid_session_id(session_id: Optional[str]) -> bool:
+    return isinstance(session_id, str) and bool(SESSION_ID_PATTERN.match(session_id))
+
+
+def resolve_references(message: str, names: List[str]) -> str:
+    """Replace pronouns with the player of the previous turn.
+
+    'what about him as captain?' -> 'what about Virat Kohli as captain?'
+    Left alone unless the previous turn was about exactly one player.
+    """
+    if len(names) != 1:
+        return message
+    subject = names[0]
+
+    def replace(match):
+        return f"{subject}'s" if match.group(1).lower() == 'his' else subject
+
+    return PRONOUN_PATTERN.sub(replace, message)
+
+
+class SessionStore:
+    """Thread-safe LRU of conversation sessions.
+
+    `idle_ttl` expires sessions nobody has used for that long; `max_sessions`
+    evicts the least recently used beyond that count. Within a session,
+    turns are truncated to `max_turn_chars`, at most `max_turns` are kept
+    verbatim, and older turns are folded into the summary whenever the
+    session would exceed `max_bytes`.
+    """
+
+    def __init__(self, max_sessions: int = 50_000, idle_ttl: float = 1800, max_bytes: int = 4096,
+                 max_turns: int = 6, max_turn_chars: int = 400, summary_lines: int = 8,
+                 summary_chars: int = 80):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.max_turns = max_turns
+        self.max_turn_chars = max_turn_chars
+        self.summary_lines = summary_lines
+        self.summary_chars = summary_chars
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.summarized = 0
+
+    def _expire(self, now: float):
+        # Least recently used first, and the TTL is the same for everyone,
+        # so expired sessions are always at the front
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_seen < self.idle_ttl:
+                break
+            self._drop(session)
+            self.expirations += 1
+
+    def _drop(self, session: Session):
+        del self._sessions[session.id]
+        self.bytes -= session.size
+
+    def _get(self, session_id: str, create: bool) -> Optional[Session]:
+        now = time.monotonic()
+        self._expire(now)
+        session = self._sessions.get(session_id)
+        if session is None:
+            if not create:
+                return None
+            session = self._sessions[session_id] = Session(session_id, self.summary_lines)
+            while len(self._sessions) > self.max_sessions:
+                self._drop(next(iter(self._sessions.values())))
+                self.evictions += 1
+        else:
+            self._sessions.move_to_end(session_id)
+        session.last_seen = now
+        return session
+
+    def players(self, session_id: str) -> List[str]:
+        """Players the session talked about last (empty for new sessions)"""
+        with self._lock:
+            session = self._get(session_id, create=False)
+            return list(session.players) if session else []
+
+    def history(self, session_id: str, max_chars: int = 800) -> List[str]:
+        """Conversation lines to give the provider, oldest first"""
+        with self._lock:
+            session = self._get(session_id, create=False)
+            return session.history(max_chars) if session else []
+
+    def record(self, session_id: str, question: str, answer: str, players: List[str] = None):
+        """Append a question/answer pair and keep the session within its caps"""
+        with self._lock:
+            session = self._get(session_id, create=True)
+            session.players = list(players or [])
+            for role, text in (('user', question), ('assistant', answer)):
+                text = ' '.join(text.split())
+                if len(text) > self.max_turn_chars:
+                    text = text[:self.max_turn_chars - 1] + '…'
+                turn = Turn(role, text, len(text.encode()))
+                session.turns.append(turn)
+                self._resize(session, turn.size)
+            while session.turns and (len(session.turns) > self.max_turns or session.size > self.max_bytes):
+                self._fold_oldest(session)
+
+    def _fold_oldest(self, session: Session):
+        """Move the oldest turn into the summary (questions only)"""
+        turn = session.turns.popleft()
+        self._resize(session, -turn.size)
+        self.summarized += 1
+        if turn.role != 'user':
+            return
+        line = turn.text if len(turn.text) <= self.summary_chars else turn.text[:self.summary_chars - 1] + '…'
+        if len(session.summary) == session.summary.maxlen:
+            self._resize(session, -len(session.summary[0].encode()))
+        session.summary.append(line)
+        self._resize(session, len(line.encode()))
+
+    def _resize(self, session: Session, delta: int):
+        session.size += delta
+        self.bytes += delta
+
+    def clear(self, session_id: str):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._drop(session)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                'sessions': len(self._sessions),
+                'bytes': self.bytes,
+                'max_sessions': self.max_sessions,
+                'max_bytes_per_session': self.max_bytes,
+                'idle_ttl_seconds': self.idle_ttl,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'summarized_turns': self.summarized
+            }
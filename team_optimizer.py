@@ -0,0 +1,154 @@
+import heapq
+from typing import Dict, List, NamedTuple, Tuple
+
+# Player roles in the database -> fantasy role groups
+ROLE_GROUPS = {
+    'WK-Batsman': 'WK',
+    'Batsman': 'BAT',
+    'All-Rounder': 'AR',
+    'Bowler': 'BOWL'
+}
+
+# (min, max) players per role group in a fantasy XI
+DEFAULT_ROLE_LIMITS = {
+    'WK': (1, 4),
+    'BAT': (3, 6),
+    'AR': (1, 4),
+    'BOWL': (3, 6)
+}
+
+
+class Candidate(NamedTuple):
+    key: str
+    team: str
+    role: str
+    price: float
+    points: float
+
+
+class Lineup(NamedTuple):
+    players: Tuple[Candidate, ...]
+    points: float
+    cost: float
+
+    @property
+    def captain(self) -> Candidate:
+        return max(self.players, key=lambda c: c.points)
+
+    @property
+    def vice_captain(self) -> Candidate:
+        return sorted(self.players, key=lambda c: c.points, reverse=True)[1]
+
+
+class TeamOptimizer:
+    """Branch-and-bound fantasy XI solver.
+
+    Candidates are explored in descending order of expected points. A branch
+    is pruned when its optimistic bound (points so far plus the best points
+    still available for the open slots) can't beat the current K-th best
+    lineup, when even the cheapest remaining players would break the budget,
+    or when the remaining pool can no longer satisfy the role minimums.
+    """
+
+    def __init__(self, budget: float = 100.0, team_size: int = 11,
+                 role_limits: Dict = None, max_per_team: int = 7):
+        self.budget = budget
+        self.team_size = team_size
+        self.role_limits = role_limits or DEFAULT_ROLE_LIMITS
+        self.max_per_team = max_per_team
+
+    def solve(self, candidates: List[Candidate], top_k: int = 1) -> List[Lineup]:
+        """Return up to top_k distinct lineups, best first"""
+        pool = sorted(candidates, key=lambda c: c.points, reverse=True)
+        n = len(pool)
+        size = self.team_size
+        roles = list(self.role_limits)
+        minimums = [self.role_limits[r][0] for r in roles]
+        maximums = [self.role_limits[r][1] for r in roles]
+        role_of = [roles.index(ROLE_GROUPS.get(c.role, c.role)) for c in pool]
+
+        # Prices in tenths of a crore so budget checks aren't subject to float drift
+        prices = [round(c.price * 10) for c in pool]
+        budget = round(self.budget * 10)
+        points = [c.points for c in pool]
+
+        # best_points[i][k]: max points from k players in pool[i:] (pool is sorted by points)
+        # cheapest[i][k]: min cost of k players in pool[i:]
+        best_points = []
+        cheapest = []
+        role_left = []
+        for i in range(n + 1):
+            best = [0.0]
+            for p in points[i:i + size]:
+                best.append(best[-1] + p)
+            best_points.append(best)
+            low = [0]
+            for price in sorted(prices[i:])[:size]:
+                low.append(low[-1] + price)
+            cheapest.append(low)
+            counts = [0] * len(roles)
+            for r in role_of[i:]:
+                counts[r] += 1
+            role_left.append(counts)
+
+        heap = []  # (points, sequence, chosen indices) min-heap of the best lineups found
+        chosen = []
+        role_count = [0] * len(roles)
+        team_count = {}
+        sequence = 0
+
+        def search(i: int, cost: int, total: float):
+            nonlocal sequence
+            slots = size - len(chosen)
+            if slots == 0:
+                sequence += 1
+                entry = (total, sequence, tuple(chosen))
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif total > heap[0][0]:
+                    heapq.heapreplace(heap, entry)
+                return
+            if n - i < slots:
+                return
+            if len(heap) == top_k and total + best_points[i][slots] <= heap[0][0]:
+                return
+            if cost + cheapest[i][slots] > budget:
+                return
+
+            deficit = 0
+            left = role_left[i]
+            for r, minimum in enumerate(minimums):
+                need = minimum - role_count[r]
+                if need > 0:
+                    if left[r] < need:
+                        return
+                    deficit += need
+            if deficit > slots:
+                return
+
+            # Include pool[i] (only if the open slots can still cover the role minimums)
+            player = pool[i]
+            r = role_of[i]
+            covers_deficit = role_count[r] < minimums[r]
+            if ((covers_deficit or deficit < slots)
+                    and role_count[r] < maximums[r]
+                    and team_count.get(player.team, 0) < self.max_per_team
+                    and cost + prices[i] <= budget):
+                chosen.append(i)
+                role_count[r] += 1
+                team_count[player.team] = team_count.get(player.team, 0) + 1
+                search(i + 1, cost + prices[i], total + points[i])
+                team_count[player.team] -= 1
+                role_count[r] -= 1
+                chosen.pop()
+
+            # Exclude pool[i]
+            search(i + 1, cost, total)
+
+        search(0, 0, 0.0)
+
+        lineups = []
+        for total, _, indices in sorted(heap, reverse=True):
+            players = tuple(pool[i] for i in indices)
+            lineups.append(Lineup(players, round(total, 2), round(sum(prices[i] for i in indices) / 10, 1)))
+        return lineups
@@ -0,0 +1,27 @@
+import os
+import sys
+
+# Offline providers and no push server, before server.py reads the environment
+os.environ.setdefault('LLM_PROVIDER', 'stub')
+os.environ.setdefault('STUB_LLM_LATENCY', '0')
+os.environ.setdefault('LIVE_PUSH_PORT', '0')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import server  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    return server.create_app(start_background=False)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def cricket_ai(app):
+    return server.cricket_ai
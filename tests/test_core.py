@@ -0,0 +1,95 @@
+"""Optimizer, form scoring, conditional GETs, team submissions and provider fallback."""
+import itertools
+import random
+
+from providers import ProviderRouter, StubProvider
+from team_optimizer import ROLE_GROUPS, Candidate, TeamOptimizer
+
+FORM_CONTEXT = {'venue': 'Wankhede Stadium, Mumbai', 'opposition': 'CSK'}
+
+
+def random_candidates(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    roles = list(ROLE_GROUPS)
+    return [Candidate(f"p{i}", rng.choice(['MI', 'CSK']), roles[i % len(roles)],
+                      rng.choice([7.5, 8.0, 8.5, 9.0, 9.5, 10.0, 11.0]), round(rng.uniform(20, 80), 1))
+            for i in range(count)]
+
+
+def brute_force(optimizer: TeamOptimizer, candidates: list) -> list:
+    """Points of every valid XI, best first"""
+    totals = []
+    for team in itertools.combinations(candidates, optimizer.team_size):
+        if sum(c.price for c in team) > optimizer.budget + 1e-9:
+            continue
+        if max(sum(c.team == t for c in team) for t in {c.team for c in team}) > optimizer.max_per_team:
+            continue
+        counts = {group: 0 for group in optimizer.role_limits}
+        for c in team:
+            counts[ROLE_GROUPS[c.role]] += 1
+        if all(low <= counts[g] <= high for g, (low, high) in optimizer.role_limits.items()):
+            totals.append(round(sum(c.points for c in team), 2))
+    return sorted(totals, reverse=True)
+
+
+def test_optimizer_matches_brute_force():
+    optimizer = TeamOptimizer()
+    for seed in range(5):
+        candidates = random_candidates(16, seed)
+        expected = brute_force(optimizer, candidates)[:3]
+        assert expected
+        lineups = optimizer.solve(candidates, top_k=3)
+        assert [lineup.points for lineup in lineups] == expected
+        for lineup in lineups:
+            assert lineup.cost <= optimizer.budget
+
+
+def test_batch_form_scoring_matches_scalar(cricket_ai):
+    names = [p['name'] for group in cricket_ai.player_db.values() for p in group.values()]
+    names += ['Nobody Special', 'hitman']
+    scalar = [cricket_ai.analyze_player_form(name, FORM_CONTEXT) for name in names]
+    assert cricket_ai.analyze_players_form_vectorized(names, FORM_CONTEXT) == scalar
+    assert cricket_ai.analyze_players_form(names, FORM_CONTEXT) == scalar
+    assert cricket_ai.analyze_players_form(names * 3, FORM_CONTEXT) == scalar * 3
+
+
+def test_dashboard_etag(client):
+    first = client.get('/api/dashboard')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert client.get('/api/dashboard', headers={'If-None-Match': etag}).status_code == 304
+    version = first.get_json()['version']
+    assert client.get(f'/api/dashboard?since={version}').status_code == 304
+
+
+def test_quick_action_etag(client):
+    for action in ('fantasy-tips', 'best-team'):
+        first = client.get(f'/api/quick-actions/{action}')
+        assert first.status_code == 200
+        etag = first.headers['ETag']
+        again = client.get(f'/api/quick-actions/{action}', headers={'If-None-Match': etag})
+        assert again.status_code == 304
+        assert again.headers['ETag'] == etag
+
+
+def test_team_submission_limits(client, monkeypatch):
+    monkeypatch.setenv('TEAMS_MAX_BATCH', '3')
+    response = client.post('/api/teams', json={'teams': [{'players': []}] * 4})
+    assert response.status_code == 413
+    response = client.post('/api/teams', json={'players': ['Nobody'] * 11})
+    assert response.status_code == 400
+    assert response.get_json()['rejected']
+
+
+def test_provider_router_falls_back_to_next_stub():
+    router = ProviderRouter([StubProvider('down', failure_rate=1.0),
+                             StubProvider('up', reply='backup answer')], deadline=2.0)
+    assert router.complete('Who should I captain?') == ('up', 'backup answer')
+    assert ProviderRouter([StubProvider('down', failure_rate=1.0)], deadline=2.0).complete('q') is None
+
+
+def test_failed_providers_fall_back_to_rule_based_answer(cricket_ai, monkeypatch):
+    monkeypatch.setattr(cricket_ai, 'llm', ProviderRouter([StubProvider('down', failure_rate=1.0)],
+                                                          deadline=2.0))
+    message = 'Who should I pick as captain in the fallback test?'
+    assert cricket_ai.get_ai_response(message) == cricket_ai.get_rule_based_response(message)
@@ -0,0 +1,19 @@
+"""Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With `preload_app` (see gunicorn.conf.py) this module is imported once in
+the master: the player database, indexes and intent router are built here,
+before the workers are forked, and shared with them copy-on-write. Threads
+and worker pools don't survive a fork, so they are started in each worker
+by the `post_worker_init` hook instead.
+"""
+import gc
+
+from server import create_app
+
+app = create_app(start_background=False)
+
+# Move everything built so far out of the collector's generations, so the
+# workers' collections don't write to (and un-share) those pages
+gc.freeze()